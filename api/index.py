@@ -1,22 +1,51 @@
 from fastapi import FastAPI, HTTPException, Header, UploadFile, File, Form, Body, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
+from dataclasses import asdict, fields as dataclass_fields
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+import asyncio
 import sys
 import os
 import json
+import re
+import uuid
+from contextlib import nullcontext
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.agent import analyze, rewrite_bullets, generate_cover_letter, validate_access_code, ensure_gemini
+from src.bullet_rewriter import RewriteStats
+from src.agent import AnalysisResult, analyze, rewrite_bullets, generate_cover_letter, validate_access_code, parse_skills
+from src.ats_session import ScoringSession, SessionStore
+from src.profiling import RunProfiler
+from src.bulk_export import ExportDocument, MAX_DOCUMENT_CHARS, MAX_EXPORT_DOCUMENTS, open_zip_stream
+from src.jd_dedup import get_jd_index
+from src.offline import analyze_offline
+from src.execution import PoolSaturated, run_cpu, run_llm, shutdown_pools, start_pools
+from src.model_router import get_router
+from src.responses import encode_response, input_etag, matching_etag, parse_fields, select_fields, validate_fields
 
 limiter = Limiter(key_func=get_remote_address)
 app = FastAPI()
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+
+def _pool_saturated_handler(request: Request, exc: PoolSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+app.add_exception_handler(PoolSaturated, _pool_saturated_handler)
+
+# Worker pools are opt-in (RESUMEBOOST_POOLS=1) for self-hosted uvicorn runs
+app.add_event_handler("startup", start_pools)
+app.add_event_handler("shutdown", shutdown_pools)
+
 allowed_origins = [
     "https://resumeboost.vercel.app",
     "https://*.vercel.app",
@@ -30,8 +59,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Profile-Id"],
 )
 
+# Per-request profiling (X-Profile: 1) is only honoured when this is set
+PROFILE_DIR = os.getenv("RESUMEBOOST_PROFILE_DIR")
+
+ANALYSIS_FIELDS = [f.name for f in dataclass_fields(AnalysisResult)]
+
 class RewriteRequest(BaseModel):
     bullets: List[str]
     jd_text: str
@@ -40,14 +75,65 @@ class CoverLetterRequest(BaseModel):
     resume_text: str
     jd_text: str
 
+class ExportDocumentRequest(BaseModel):
+    name: str
+    text: str
+
+class BulkExportRequest(BaseModel):
+    documents: List[ExportDocumentRequest]
+    filename: str = "documents.zip"
+
+# What-if sessions stay in memory, so their inputs are capped like /api/analyze's
+MAX_SIMULATE_RESUME_CHARS = 50000
+MAX_SIMULATE_JD_CHARS = 10000
+MAX_SIMULATE_JD_SKILLS = 500
+MAX_SIMULATE_EDITS = 100
+
+class SimulateRequest(BaseModel):
+    resume_text: str
+    jd_text: Optional[str] = None
+    jd_skills: Optional[List[str]] = None
+
+class LineEdit(BaseModel):
+    start: int
+    end: int
+    text: Optional[str] = None
+
+class SimulateEditRequest(BaseModel):
+    edits: List[LineEdit]
+
+scoring_sessions = SessionStore()
+
 def verify_access(x_access_code: Optional[str] = Header(None)):
     if not validate_access_code(x_access_code):
         raise HTTPException(status_code=403, detail="Invalid or missing Access Code")
 
+# Pool jobs run on the LLM thread pool and share the process-wide model router
+def _analyze_job(resume_text: str, jd_text: str, profile_prefix: Optional[str] = None):
+    # The profiler starts in the worker thread so cProfile sees the pipeline.
+    # Returns whether this run was profiled: only one run is profiled at a time.
+    with RunProfiler(profile_prefix) if profile_prefix else nullcontext() as profiler:
+        result = analyze(resume_text, jd_text, model=get_router())
+    return result, profiler is not None and profiler.active
+
+def _rewrite_job(bullets: List[str], jd_text: str):
+    stats = RewriteStats()
+    rewritten = rewrite_bullets(get_router(), bullets, jd_text, stats=stats)
+    return rewritten, sorted(stats.fallback_indices)
+
+def _cover_letter_job(resume_text: str, jd_text: str):
+    return generate_cover_letter(get_router(), resume_text, jd_text)
+
 @app.get("/api/health")
 def health_check():
     return {"status": "ok"}
 
+@app.get("/api/jd-index/stats")
+def jd_index_stats(x_access_code: Optional[str] = Header(None)):
+    """Near-duplicate JD reuse: hit counts and upstream model calls saved."""
+    verify_access(x_access_code)
+    return get_jd_index().report()
+
 @app.post("/api/analyze")
 @limiter.limit("20/hour")
 async def analyze_resume(
@@ -55,9 +141,19 @@ async def analyze_resume(
     resume_file: UploadFile = File(None),
     resume_text: Optional[str] = Form(None),
     jd_text: str = Form(...),
-    x_access_code: Optional[str] = Header(None)
+    fields: Optional[str] = None,
+    offline: bool = False,
+    drafts: bool = False,
+    x_access_code: Optional[str] = Header(None),
+    x_profile: Optional[str] = Header(None)
 ):
     verify_access(x_access_code)
+
+    selected = parse_fields(fields)
+    try:
+        validate_fields(selected, ANALYSIS_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     MAX_FILE_SIZE = 5 * 1024 * 1024
     MAX_JD_LENGTH = 10000
@@ -76,12 +172,10 @@ async def analyze_resume(
         filename = resume_file.filename.lower()
         if filename.endswith(".pdf"):
             try:
-                import pypdf
-                import io
-                pdf_reader = pypdf.PdfReader(io.BytesIO(content))
-                final_resume_text = ""
-                for page in pdf_reader.pages:
-                    final_resume_text += page.extract_text() + "\n"
+                from src.pdf_utils import extract_pdf_text
+                final_resume_text = await run_cpu(extract_pdf_text, content)
+            except PoolSaturated:
+                raise
             except ImportError:
                 raise HTTPException(status_code=500, detail="pypdf not installed on server")
             except Exception as e:
@@ -96,13 +190,37 @@ async def analyze_resume(
     else:
         raise HTTPException(status_code=400, detail="Must provide resume_file or resume_text")
 
+    # The ETag depends only on the inputs, so a repeat request skips the analysis entirely
+    # Offline results differ from model results for the same inputs, so they get their own tag
+    mode = [("offline+drafts" if drafts else "offline")] if offline else []
+    etag = input_etag(final_resume_text, jd_text, ",".join(selected or ANALYSIS_FIELDS), *mode)
+    matched = matching_etag(request.headers.get("if-none-match"), etag)
+    if matched:
+        return Response(status_code=304, headers={"ETag": matched, "Vary": "Accept-Encoding"})
+
+    profile_id = f"analyze-{uuid.uuid4().hex[:12]}" if PROFILE_DIR and x_profile == "1" else None
+    profile_prefix = os.path.join(PROFILE_DIR, profile_id) if profile_id else None
+
+    profiled = False
     try:
-        # We pass empty bullets initially for the full analysis
-        result = analyze(final_resume_text, jd_text, [])
-        return result
+        if offline:
+            # No model calls, but still about a millisecond of CPU; keep it off the event loop
+            result = await run_cpu(analyze_offline, final_resume_text, jd_text, None, drafts)
+        else:
+            # Bullets are extracted from the resume so rewriting happens in this same request
+            result, profiled = await run_llm(_analyze_job, final_resume_text, jd_text, profile_prefix)
+    except PoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    body, headers = encode_response(
+        select_fields(asdict(result), selected), etag, request.headers.get("accept-encoding")
+    )
+    if profiled:
+        headers["X-Profile-Id"] = profile_id
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @app.post("/api/download-docx")
 async def download_docx(
@@ -116,33 +234,123 @@ async def download_docx(
         if not text:
             raise HTTPException(status_code=400, detail="No text provided")
             
-        from src.docx_utils import markdown_to_docx
-        docx_io = markdown_to_docx(text)
+        from src.docx_utils import markdown_to_docx_bytes
+        docx_bytes = await run_cpu(markdown_to_docx_bytes, text)
         
         return Response(
-            content=docx_io.getvalue(),
+            content=docx_bytes,
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             headers={"Content-Disposition": "attachment; filename=tailored_resume.docx"}
         )
+    except (HTTPException, PoolSaturated):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/download-zip")
+@limiter.limit("10/hour")
+async def download_zip(request: Request, req: BulkExportRequest, x_access_code: Optional[str] = Header(None)):
+    """Render many Markdown documents to DOCX and stream them back as one ZIP archive.
+
+    Errors in the first document (or a saturated pool) become an error response.
+    After that the 200 response has started, so a later render failure, or a pool
+    that stays saturated, ends the stream early and the client gets a truncated
+    archive.
+    """
+    verify_access(x_access_code)
+    if not req.documents:
+        raise HTTPException(status_code=400, detail="No documents provided")
+    if len(req.documents) > MAX_EXPORT_DOCUMENTS:
+        raise HTTPException(status_code=400, detail=f"Too many documents. Maximum {MAX_EXPORT_DOCUMENTS}.")
+    if any(not doc.text or len(doc.text) > MAX_DOCUMENT_CHARS for doc in req.documents):
+        raise HTTPException(
+            status_code=400, detail=f"Each document needs text of at most {MAX_DOCUMENT_CHARS} characters."
+        )
+
+    documents = [ExportDocument(doc.name, doc.text) for doc in req.documents]
+    try:
+        stream = await open_zip_stream(documents, run_cpu)
+    except (HTTPException, PoolSaturated):
+        raise
+    except ImportError:
+        raise HTTPException(status_code=500, detail="python-docx not installed on server")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    filename = re.sub(r"[^A-Za-z0-9._-]+", "_", req.filename).strip("._") or "documents"
+    if not filename.lower().endswith(".zip"):
+        filename += ".zip"
+    return StreamingResponse(
+        stream,
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
 @app.post("/api/rewrite")
-def rewrite_bullets_endpoint(req: RewriteRequest, x_access_code: Optional[str] = Header(None)):
+async def rewrite_bullets_endpoint(req: RewriteRequest, x_access_code: Optional[str] = Header(None)):
     verify_access(x_access_code)
     try:
-        model = ensure_gemini()
-        rewritten = rewrite_bullets(model, req.bullets, req.jd_text)
-        return {"rewritten_bullets": rewritten}
+        rewritten, not_rewritten = await run_llm(_rewrite_job, req.bullets, req.jd_text)
+        # Indices kept as-is because their chunk failed, so clients don't mistake them for rewrites
+        return {"rewritten_bullets": rewritten, "not_rewritten": not_rewritten}
+    except PoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/cover-letter")
-def cover_letter_endpoint(req: CoverLetterRequest, x_access_code: Optional[str] = Header(None)):
+async def cover_letter_endpoint(req: CoverLetterRequest, x_access_code: Optional[str] = Header(None)):
     verify_access(x_access_code)
     try:
-        model = ensure_gemini()
-        letter = generate_cover_letter(model, req.resume_text, req.jd_text)
+        letter = await run_llm(_cover_letter_job, req.resume_text, req.jd_text)
         return {"cover_letter": letter}
+    except PoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/simulate")
+@limiter.limit("60/hour")
+async def create_simulation(request: Request, req: SimulateRequest, x_access_code: Optional[str] = Header(None)):
+    verify_access(x_access_code)
+    if req.jd_skills is None and not req.jd_text:
+        raise HTTPException(status_code=400, detail="Must provide jd_skills or jd_text")
+    if len(req.resume_text) > MAX_SIMULATE_RESUME_CHARS:
+        raise HTTPException(status_code=400, detail=f"Resume too long. Maximum {MAX_SIMULATE_RESUME_CHARS:,} characters.")
+    if req.jd_text and len(req.jd_text) > MAX_SIMULATE_JD_CHARS:
+        raise HTTPException(status_code=400, detail=f"Job description too long. Maximum {MAX_SIMULATE_JD_CHARS:,} characters.")
+    if req.jd_skills is not None and len(req.jd_skills) > MAX_SIMULATE_JD_SKILLS:
+        raise HTTPException(status_code=400, detail=f"Too many skills. Maximum {MAX_SIMULATE_JD_SKILLS}.")
+    jd_skills = req.jd_skills if req.jd_skills is not None else parse_skills(req.jd_text)
+    # Tens of milliseconds for a long resume; keep it off the event loop. Sessions hold
+    # compiled patterns and live in this process, so a thread rather than run_cpu
+    session = await asyncio.get_running_loop().run_in_executor(None, ScoringSession, req.resume_text, jd_skills)
+    session_id = scoring_sessions.create(session)
+    return {"session_id": session_id, "line_count": len(session.lines), **session.result()}
+
+@app.post("/api/simulate/{session_id}")
+@limiter.limit("600/hour")
+async def edit_simulation(
+    request: Request, session_id: str, req: SimulateEditRequest, x_access_code: Optional[str] = Header(None)
+):
+    """Apply line edits to a what-if session, all or nothing. Never calls the model."""
+    verify_access(x_access_code)
+    session = scoring_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired simulation session")
+    if len(req.edits) > MAX_SIMULATE_EDITS:
+        raise HTTPException(status_code=400, detail=f"Too many edits. Maximum {MAX_SIMULATE_EDITS} per request.")
+    added = sum(len(edit.text or "") for edit in req.edits)
+    if session.text_length + added > MAX_SIMULATE_RESUME_CHARS:
+        raise HTTPException(status_code=400, detail=f"Resume too long. Maximum {MAX_SIMULATE_RESUME_CHARS:,} characters.")
+    before = session.result()
+    try:
+        after = session.apply_edits((edit.start, edit.end, edit.text) for edit in req.edits)
+    except IndexError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "line_count": len(session.lines),
+        **after,
+        "delta": after["score"] - before["score"],
+        "breakdown_delta": {k: after["breakdown"][k] - before["breakdown"][k] for k in after["breakdown"]},
+    }
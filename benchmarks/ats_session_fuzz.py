@@ -0,0 +1,100 @@
+"""Random-edit equivalence check and latency of incremental what-if scoring.
+
+Applies random line edits to a ScoringSession (src/ats_session.py) and, after
+every edit, compares its breakdown with score_ats on the session's full text,
+with the JD skills (including phrases like "spring boot") matched in that text.
+Also checks that a batch with a bad range leaves the session unchanged.
+Exits non-zero on any mismatch.
+
+Usage: python benchmarks/ats_session_fuzz.py [--edits N] [--seed S]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.agent import load_text, parse_skills_regex, score_ats
+from src.ats_session import ScoringSession, match_skills, skill_patterns
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+# Lines that move sections, contact details, blank-line runs and number context across edits
+EXTRA_LINES = [
+    "", "", "  ", "EDUCATION", "Skills", "Python Kafka 30% $4,000", "a@b.com 555-222-3333",
+    "linkedin.com/in/someone", "May 2020", "2021", "• ", "-", "Jan 2020\n\n\n\nLed 5 teams",
+    "Increased revenue by 12 points", "ARCHITECTED A PLATFORM FOR 40 TEAMS",
+    "Spring Boot and React.js on AWS", "C++ services, spring  boot", "Machine\nLearning",
+]
+# Model-extracted JD skills include phrases and punctuated names
+PHRASE_SKILLS = {"Spring Boot", "React.js", "machine learning", "C++"}
+
+
+def full_breakdown(text: str, patterns: list) -> dict:
+    jd_skills = {skill for skill, _, _ in patterns}
+    return score_ats(text, jd_skills, set(match_skills(text, patterns)))["breakdown"]
+
+
+def random_edit(rng: random.Random, line_count: int, pool: list):
+    start = rng.randint(0, line_count)
+    end = min(line_count, start + rng.randint(0, 2))
+    if rng.random() < 0.2:
+        return start, end, None
+    return start, end, "\n".join(rng.choice(pool) for _ in range(rng.randint(1, 2)))
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edits", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    resume = load_text(os.path.join(ROOT, "resume.txt"))
+    jd_skills = parse_skills_regex(load_text(os.path.join(ROOT, "job.txt"))) | PHRASE_SKILLS
+    patterns = skill_patterns(jd_skills)
+    pool = resume.split("\n") + EXTRA_LINES
+    rng = random.Random(args.seed)
+
+    session = ScoringSession(resume, jd_skills)
+    mismatches = int(session.breakdown != full_breakdown(resume, patterns))
+    edit_us, full_us = [], []
+    for _ in range(args.edits):
+        start, end, text = random_edit(rng, len(session.lines), pool)
+        t0 = time.perf_counter()
+        session.replace_lines(start, end, text)
+        edit_us.append((time.perf_counter() - t0) * 1e6)
+
+        t0 = time.perf_counter()
+        expected = full_breakdown(session.text, patterns)
+        full_us.append((time.perf_counter() - t0) * 1e6)
+        if session.breakdown != expected:
+            mismatches += 1
+            diff = {k: (expected[k], session.breakdown[k]) for k in expected if expected[k] != session.breakdown[k]}
+            print(f"mismatch after {start}:{end} {text!r}: {diff} (full, incremental)")
+
+    # A batch whose last range is out of bounds must not apply its earlier edits
+    before_text, before = session.text, session.result()
+    batch = [random_edit(rng, len(session.lines), pool), (0, len(session.lines) + 10, "x")]
+    try:
+        session.apply_edits(batch)
+        print("bad batch was applied")
+        mismatches += 1
+    except IndexError:
+        if session.text != before_text or session.result() != before:
+            print("bad batch left the session partially edited")
+            mismatches += 1
+
+    print(f"{args.edits} edits, {len(session.lines)} lines at the end, {mismatches} mismatches")
+    print(f"incremental edit  p50 {percentile(edit_us, 0.5):>7.0f} µs  p95 {percentile(edit_us, 0.95):>7.0f} µs")
+    print(f"full rescoring    p50 {percentile(full_us, 0.5):>7.0f} µs  p95 {percentile(full_us, 0.95):>7.0f} µs")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Documents per second and peak memory of bulk DOCX export to a ZIP archive.
+
+Compares the streamed export (src/bulk_export.py) against building the whole
+archive in memory, at several pool sizes. Each case runs in a fresh process so
+peak RSS is measured per case.
+
+Usage: python benchmarks/bulk_export.py [--documents N] [--workers 1,2,4]
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.agent import load_text
+from src.bulk_export import ExportDocument, _render_docx, entry_name, export_zip
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+COVER_LETTER = (
+    "Dear Hiring Manager,\n\n"
+    + "I am excited to apply for this role and bring **measurable results** to your team. " * 12
+    + "\n\nSincerely,\nCandidate"
+)
+
+
+def sample_documents(count: int):
+    """Alternating tailored resumes and cover letters, like a batch tailoring run's output."""
+    resume = "\n".join(
+        f"- {line.strip('•').strip()}" if line.startswith("•") else line
+        for line in load_text(os.path.join(ROOT, "resume.txt")).splitlines()
+    )
+    for i in range(count):
+        if i % 2 == 0:
+            yield ExportDocument(f"job_{i // 2:04d}_resume", f"# Candidate {i}\n{resume}")
+        else:
+            yield ExportDocument(f"job_{i // 2:04d}_cover_letter", COVER_LETTER)
+
+
+def buffered_export(documents, output_path: str, workers: int) -> int:
+    """Baseline: render everything, build the archive in memory, then write it."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rendered = list(executor.map(_render_docx, [d.text for d in documents]))
+    buffer, used = io.BytesIO(), set()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for document, data in zip(documents, rendered):
+            archive.writestr(entry_name(document.name, used), data)
+    with open(output_path, "wb") as f:
+        f.write(buffer.getvalue())
+    return len(rendered)
+
+
+def run_case(mode: str, documents: int, workers: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "export.zip")
+        tracemalloc.start()
+        start = time.perf_counter()
+        if mode == "streamed":
+            count = export_zip(sample_documents(documents), output, workers=workers)
+        else:
+            count = buffered_export(list(sample_documents(documents)), output, workers)
+        elapsed = time.perf_counter() - start
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = os.path.getsize(output)
+    # ru_maxrss is in KiB on Linux
+    return {
+        "mode": mode,
+        "workers": workers,
+        "documents": count,
+        "docs_per_s": count / elapsed,
+        "archive_mb": size / 1e6,
+        "parent_peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "worker_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "parent_traced_peak_mb": traced_peak / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=400)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated pool sizes")
+    parser.add_argument("--modes", default="streamed,buffered")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.documents, int(args.workers))))
+        return
+
+    print(f"{'mode':<10}{'workers':>8}{'docs/s':>9}{'archive MB':>12}"
+          f"{'parent RSS MB':>15}{'worker RSS MB':>15}{'traced MB':>11}")
+    for workers in [int(w) for w in args.workers.split(",")]:
+        for mode in args.modes.split(","):
+            out = subprocess.run(
+                [sys.executable, __file__, "--case", mode, "--documents", str(args.documents),
+                 "--workers", str(workers)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{r['mode']:<10}{r['workers']:>8}{r['docs_per_s']:>9.1f}{r['archive_mb']:>12.1f}"
+                  f"{r['parent_peak_rss_mb']:>15.1f}{r['worker_peak_rss_mb']:>15.1f}"
+                  f"{r['parent_traced_peak_mb']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""Concurrent load test for api/index.py with a local fake Gemini backend.
+
+Replays a weighted mix of /api/analyze (text and PDF), /api/rewrite,
+/api/cover-letter and /api/download-docx, either in-process (ASGI transport)
+or against `uvicorn --workers N`, at a fixed concurrency or a target RPS.
+Reports latency histograms, throughput, status counts and worker memory.
+
+Requires httpx (and uvicorn for --mode uvicorn).
+
+Examples:
+  python benchmarks/load_test.py --concurrency 16 --duration 30
+  python benchmarks/load_test.py --mode uvicorn --workers 4 --rps 20 --duration 60
+  python benchmarks/load_test.py --sweep 1,4,16,64 --duration 15 --report load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+ACCESS_CODE = "load-test"
+HISTOGRAM_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+DEFAULT_MIX = "analyze_text=3,analyze_pdf=1,rewrite=3,cover_letter=2,download_docx=1"
+
+
+def minimal_pdf(lines: List[str]) -> bytes:
+    """A one-page PDF with the given text lines, readable by pypdf."""
+    def escape(text: str) -> str:
+        text = text.encode("latin-1", "replace").decode("latin-1")
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    content = "BT /F1 10 Tf 50 780 Td 12 TL " + " ".join(f"({escape(l)}) '" for l in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(content.encode('latin-1'))} >>\nstream\n{content}\nendstream",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return out
+
+
+class Traffic:
+    """Builds requests for each traffic type from the sample resume and JD."""
+
+    def __init__(self, mix: str, vary_inputs: bool, seed: int):
+        self.resume = open(os.path.join(ROOT, "resume.txt"), encoding="utf-8").read()
+        self.jd = open(os.path.join(ROOT, "job.txt"), encoding="utf-8").read()[:9000]
+        self.pdf = minimal_pdf([l.strip() for l in self.resume.splitlines() if l.strip()][:60])
+        self.bullets = [l.strip("•\t ") for l in self.resume.splitlines() if l.startswith("•")][:10]
+        self.vary_inputs = vary_inputs
+        self.random = random.Random(seed)
+        self.counter = 0
+        weights = dict(item.split("=") for item in mix.split(","))
+        self.kinds = list(weights)
+        self.weights = [float(w) for w in weights.values()]
+
+    def _jd(self) -> str:
+        # A unique suffix defeats the bullet and ETag caches; the near-duplicate JD index
+        # would still match it, so configure_env turns that off for varied inputs
+        self.counter += 1
+        return f"{self.jd}\nRef {self.counter}" if self.vary_inputs else self.jd
+
+    def next(self):
+        kind = self.random.choices(self.kinds, self.weights)[0]
+        headers = {"x-access-code": ACCESS_CODE}
+        if kind == "analyze_text":
+            return kind, "/api/analyze", dict(headers=headers, data={"resume_text": self.resume, "jd_text": self._jd()})
+        if kind == "analyze_pdf":
+            return kind, "/api/analyze", dict(
+                headers=headers, data={"jd_text": self._jd()},
+                files={"resume_file": ("resume.pdf", self.pdf, "application/pdf")},
+            )
+        if kind == "rewrite":
+            return kind, "/api/rewrite", dict(headers=headers, json={"bullets": self.bullets, "jd_text": self._jd()})
+        if kind == "cover_letter":
+            return kind, "/api/cover-letter", dict(headers=headers, json={"resume_text": self.resume, "jd_text": self._jd()})
+        if kind == "download_docx":
+            return kind, "/api/download-docx", dict(headers=headers, json={"text": self.resume})
+        raise ValueError(f"Unknown traffic type: {kind}")
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.started = time.perf_counter()
+        self.finished = self.started
+
+    def record(self, kind: str, status, latency_ms: float):
+        self.latencies[kind].append(latency_ms)
+        self.statuses[kind][str(status)] += 1
+        self.finished = time.perf_counter()
+
+    def summary(self) -> dict:
+        elapsed = max(self.finished - self.started, 1e-9)
+        per_kind = {kind: _summarize(lat, self.statuses[kind]) for kind, lat in sorted(self.latencies.items())}
+        all_latencies = [l for lat in self.latencies.values() for l in lat]
+        all_statuses = sum(self.statuses.values(), Counter())
+        overall = _summarize(all_latencies, all_statuses)
+        overall["throughput_rps"] = round(overall["requests"] / elapsed, 2)
+        ok = sum(n for s, n in all_statuses.items() if s.startswith("2") or s == "304")
+        overall["goodput_rps"] = round(ok / elapsed, 2)
+        overall["elapsed_s"] = round(elapsed, 2)
+        return {"overall": overall, "endpoints": per_kind}
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _summarize(latencies: List[float], statuses: Counter) -> dict:
+    values = sorted(latencies)
+    histogram = Counter()
+    for value in values:
+        bucket = next((f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS if value <= b), f">{HISTOGRAM_BUCKETS_MS[-1]}ms")
+        histogram[bucket] += 1
+    return {
+        "requests": len(values),
+        "p50_ms": round(_percentile(values, 0.50), 1),
+        "p90_ms": round(_percentile(values, 0.90), 1),
+        "p99_ms": round(_percentile(values, 0.99), 1),
+        "max_ms": round(values[-1], 1) if values else 0.0,
+        "statuses": dict(statuses),
+        "errors": sum(n for s, n in statuses.items() if not (s.startswith("2") or s == "304")),
+        "rate_limited": statuses.get("429", 0),
+        "rejected_busy": statuses.get("503", 0),
+        "histogram": {b: histogram[b] for b in [f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] if histogram[b]},
+    }
+
+
+async def _send(client, traffic: Traffic, stats: Stats):
+    kind, path, kwargs = traffic.next()
+    start = time.perf_counter()
+    try:
+        response = await client.post(path, **kwargs)
+        status = response.status_code
+    except Exception as e:
+        status = type(e).__name__
+    stats.record(kind, status, (time.perf_counter() - start) * 1000)
+
+
+async def run_closed_loop(client, traffic: Traffic, concurrency: int, duration: float) -> Stats:
+    """`concurrency` virtual users, each sending its next request as soon as the last returns."""
+    stats = Stats()
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        while time.perf_counter() < deadline:
+            await _send(client, traffic, stats)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return stats
+
+
+async def run_open_loop(client, traffic: Traffic, rps: float, duration: float) -> Stats:
+    """Poisson arrivals at `rps`, regardless of how fast the server responds."""
+    stats = Stats()
+    deadline = time.perf_counter() + duration
+    tasks = []
+    while time.perf_counter() < deadline:
+        tasks.append(asyncio.ensure_future(_send(client, traffic, stats)))
+        await asyncio.sleep(traffic.random.expovariate(rps))
+    await asyncio.gather(*tasks)
+    return stats
+
+
+# --- Memory ---------------------------------------------------------------
+
+def _proc_status(pid: int) -> Dict[str, int]:
+    values = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key, amount = line.split(":", 1)
+                    values[key] = int(amount.split()[0]) * 1024
+    except OSError:
+        pass
+    return values
+
+
+def _child_pids(parent: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    if int(f.read().rsplit(")", 1)[1].split()[1]) == parent:
+                        children.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    return children
+
+
+def worker_memory(server: Optional[subprocess.Popen]) -> List[dict]:
+    """RSS and peak RSS per worker process (Linux /proc), or for this process in-process."""
+    if server is None:
+        status = _proc_status(os.getpid())
+        peak = status.get("VmHWM", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+        return [{"pid": os.getpid(), "rss_bytes": status.get("VmRSS"), "peak_rss_bytes": peak}]
+    pids = _child_pids(server.pid) or [server.pid]
+    return [
+        {"pid": pid, "rss_bytes": s.get("VmRSS"), "peak_rss_bytes": s.get("VmHWM")}
+        for pid, s in ((pid, _proc_status(pid)) for pid in pids)
+    ]
+
+
+# --- App under test -------------------------------------------------------
+
+def configure_env(args) -> Dict[str, str]:
+    env = {
+        "GEMINI_MODEL": "fake",
+        "APP_ACCESS_CODE": ACCESS_CODE,
+        "FAKE_MODEL_LATENCY_MS": str(args.latency_ms),
+        "FAKE_MODEL_SIGMA": str(args.sigma),
+        "FAKE_MODEL_ERROR_RATE": str(args.error_rate),
+    }
+    if not args.rate_limit:
+        env["RATELIMIT_ENABLED"] = "false"
+    if args.pools:
+        env["RESUMEBOOST_POOLS"] = "1"
+    if args.vary_inputs:
+        # "Ref N" variants are near-duplicates, so the JD index would skip the real work
+        env["RESUMEBOOST_JD_SIMILARITY"] = "0"
+    os.environ.update(env)
+    return env
+
+
+def start_uvicorn(workers: int) -> Tuple[subprocess.Popen, str]:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.index:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                return server, base_url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not become healthy")
+
+
+async def run_level(args, traffic: Traffic, concurrency: Optional[int], server, base_url) -> dict:
+    limits = httpx.Limits(max_connections=max(concurrency or 0, 100))
+    if server is None:
+        from api.index import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test",
+                                   timeout=args.timeout, limits=limits)
+    else:
+        client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits)
+    async with client:
+        if args.rps:
+            stats = await run_open_loop(client, traffic, args.rps, args.duration)
+        else:
+            stats = await run_closed_loop(client, traffic, concurrency, args.duration)
+    summary = stats.summary()
+    summary["concurrency"] = concurrency
+    summary["target_rps"] = args.rps
+    summary["memory"] = worker_memory(server)
+    return summary
+
+
+def print_summary(summary: dict):
+    overall = summary["overall"]
+    label = f"rps={summary['target_rps']}" if summary["target_rps"] else f"concurrency={summary['concurrency']}"
+    print(f"\n== {label}: {overall['requests']} requests in {overall['elapsed_s']}s, "
+          f"{overall['throughput_rps']} rps ({overall['goodput_rps']} ok/s), "
+          f"errors={overall['errors']} 429={overall['rate_limited']} 503={overall['rejected_busy']}")
+    print(f"{'endpoint':<16}{'n':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  statuses")
+    for kind, s in list(summary["endpoints"].items()) + [("ALL", overall)]:
+        print(f"{kind:<16}{s['requests']:>7}{s['p50_ms']:>9}{s['p90_ms']:>9}{s['p99_ms']:>9}{s['max_ms']:>9}  {s['statuses']}")
+    print("histogram (all):", overall["histogram"])
+    for m in summary["memory"]:
+        rss = (m["rss_bytes"] or 0) / 2**20
+        peak = (m["peak_rss_bytes"] or 0) / 2**20
+        print(f"worker {m['pid']}: rss={rss:.1f}MiB peak={peak:.1f}MiB")
+
+
+def find_saturation(results: List[dict]) -> Optional[int]:
+    """First level where goodput grows <10% over the previous level or errors exceed 1%."""
+    for previous, current in zip(results, results[1:]):
+        o, p = current["overall"], previous["overall"]
+        error_ratio = o["errors"] / max(o["requests"], 1)
+        if o["goodput_rps"] < p["goodput_rps"] * 1.1 or error_ratio > 0.01:
+            return current["concurrency"]
+    return None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load test the ResumeBoost API with a fake model")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=8, help="Closed-loop virtual users")
+    load.add_argument("--rps", type=float, help="Open-loop target requests per second")
+    load.add_argument("--sweep", help="Comma-separated concurrency levels to find the saturation point")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per load level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Traffic weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Fake model median latency")
+    parser.add_argument("--sigma", type=float, default=0.4, help="Fake model log-normal spread")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake model error probability")
+    parser.add_argument("--rate-limit", action="store_true", help="Keep slowapi rate limits enabled")
+    parser.add_argument("--pools", action="store_true", help="Enable RESUMEBOOST_POOLS worker pools")
+    parser.add_argument("--no-vary-inputs", dest="vary_inputs", action="store_false",
+                        help="Send identical JDs so bullet caches can hit")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", help="Write the full JSON report to this path")
+    return parser
+
+
+async def main_async(args):
+    configure_env(args)
+    traffic = Traffic(args.mix, args.vary_inputs, args.seed)
+    server, base_url = (None, None)
+    if args.mode == "uvicorn":
+        server, base_url = start_uvicorn(args.workers)
+    elif args.pools:
+        from src.execution import start_pools
+        start_pools()
+    try:
+        levels = [int(c) for c in args.sweep.split(",")] if args.sweep else [args.concurrency]
+        results = []
+        for concurrency in levels:
+            summary = await run_level(args, traffic, None if args.rps else concurrency, server, base_url)
+            print_summary(summary)
+            results.append(summary)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        elif args.pools:
+            from src.execution import shutdown_pools
+            shutdown_pools()
+
+    report = {"config": vars(args), "results": results}
+    if args.sweep:
+        report["saturation_concurrency"] = find_saturation(results)
+        print(f"\nsaturation point: concurrency={report['saturation_concurrency']}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+def main():
+    args = build_parser().parse_args()
+    if httpx is None:
+        sys.exit("httpx is required: pip install httpx")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Single-core throughput of offline (no-model) scoring for bulk screening.
+
+Scores synthetic resumes built from the sample resume's lines against the
+sample JD, using one OfflineScorer so the JD is processed once. What remains
+per resume is about a dozen whole-text scans (regexes, splits, substring
+checks), so throughput scales with resume length and single-core speed.
+
+Usage: python benchmarks/offline_scoring.py [--resumes N] [--drafts]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.agent import load_text
+from src.offline import OfflineScorer, analyze_offline
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+CONTACT_LINES = [
+    "jane.doe@gmail.com | (555) 123-4567 | linkedin.com/in/janedoe",
+    "john.smith@example.com | 555-987-6543",
+    "",
+]
+
+
+def synthetic_resumes(count: int, seed: int) -> list:
+    """Resumes of varying length made by sampling and reordering the sample resume's lines."""
+    lines = load_text(os.path.join(ROOT, "resume.txt")).splitlines()
+    header, body = lines[:1], lines[1:]
+    rng = random.Random(seed)
+    resumes = []
+    for _ in range(count):
+        keep = rng.uniform(0.35, 1.0)
+        sampled = [line for line in body if rng.random() < keep]
+        resumes.append("\n".join(header + [rng.choice(CONTACT_LINES)] + sampled))
+    return resumes
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+def run(label: str, fn, resumes: list):
+    latencies = []
+    start = time.perf_counter()
+    for resume in resumes:
+        t0 = time.perf_counter()
+        fn(resume)
+        latencies.append((time.perf_counter() - t0) * 1e6)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<34} {len(resumes) / elapsed:>9.0f}/s"
+        f"  p50 {percentile(latencies, 0.5):>7.0f} µs  p95 {percentile(latencies, 0.95):>7.0f} µs"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=5000)
+    parser.add_argument("--drafts", action="store_true", help="Also generate template bullet and cover-letter drafts")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    jd_text = load_text(os.path.join(ROOT, "job.txt"))
+    resumes = synthetic_resumes(args.resumes, args.seed)
+    words = sum(len(r.split()) for r in resumes) / len(resumes)
+    print(f"{len(resumes)} resumes, {words:.0f} words on average, drafts={'on' if args.drafts else 'off'}\n")
+
+    scorer = OfflineScorer(jd_text, drafts=args.drafts)
+    run("OfflineScorer (JD processed once)", scorer.analyze, resumes)
+    run("analyze_offline (JD per call)", lambda r: analyze_offline(r, jd_text, drafts=args.drafts), resumes)
+
+
+if __name__ == "__main__":
+    main()
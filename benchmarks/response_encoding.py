@@ -0,0 +1,76 @@
+"""Bytes on the wire and encode time for /api/analyze response variants.
+
+Usage: python benchmarks/response_encoding.py [--iterations N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.agent import AnalysisResult, load_text, parse_skills
+from src import responses
+from src.responses import encode_response, input_etag, parse_fields, select_fields
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def sample_result() -> dict:
+    """An AnalysisResult sized like a real one, built from the sample resume and JD."""
+    resume_text = load_text(os.path.join(ROOT, "resume.txt"))
+    jd_text = load_text(os.path.join(ROOT, "job.txt"))
+    jd_skills, resume_skills = parse_skills(jd_text), parse_skills(resume_text)
+    bullets = [line.strip("•\t ") for line in resume_text.splitlines() if line.startswith("•")]
+    result = AnalysisResult(
+        jd_skills=sorted(jd_skills),
+        resume_skills=sorted(resume_skills),
+        missing_skills=sorted(jd_skills - resume_skills),
+        overlap_skills=sorted(jd_skills & resume_skills),
+        rewritten_bullets=bullets,
+        cover_letter=" ".join(bullets[:6]),
+        tailored_resume=resume_text,
+        ats_score=72,
+        ats_breakdown={"keywords": 24, "sections": 15, "contact": 8, "format": 12,
+                       "length": 4, "action_verbs": 7, "achievements": 8},
+        ats_recommendations=["Add more keywords from the job description to your resume"] * 3,
+    )
+    return asdict(result)
+
+
+def timed(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    data = sample_result()
+    etag = input_etag("resume", "jd", "")
+    score_only = select_fields(data, parse_fields("ats_score,missing_skills"))
+
+    cases = [
+        ("json.dumps (baseline)", lambda: (json.dumps(data).encode("utf-8"), {})),
+        ("compact, identity", lambda: encode_response(data, etag, None)),
+        ("compact, gzip", lambda: encode_response(data, etag, "gzip")),
+    ]
+    if responses.brotli is not None:
+        cases.append(("compact, br", lambda: encode_response(data, etag, "br")))
+    cases.append(("?fields=ats_score,missing_skills", lambda: encode_response(score_only, etag, "gzip, br")))
+
+    print(f"encoder: {'orjson' if responses.orjson is not None else 'json'}")
+    print(f"{'variant':<36}{'bytes':>10}{'encode us':>12}")
+    for name, fn in cases:
+        body, _ = fn()
+        print(f"{name:<36}{len(body):>10}{timed(fn, args.iterations):>12.1f}")
+    print(f"{'304 Not Modified':<36}{0:>10}{'-':>12}")
+
+
+if __name__ == "__main__":
+    main()
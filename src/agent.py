@@ -3,8 +3,9 @@ import json
 import os
 import re
 import sys
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Set, Optional
+from contextlib import nullcontext
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Set, Optional, Tuple, Union
 
 try:
     from dotenv import load_dotenv
@@ -17,6 +18,10 @@ try:
 except ImportError:
     genai = None
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.bullet_rewriter import RewriteStats, rewrite_bullets_parallel
+from src.profiling import RunProfiler, stage
+
 
 SKILL_REGEX = re.compile(r"\b[A-Za-z][A-Za-z0-9+\-/#]{1,}\b")
 
@@ -78,6 +83,38 @@ NON_TECHNICAL_WORDS = {
 }
 
 
+# Standard resume section headers, shared by ATS scoring and the resume parser
+CRITICAL_SECTIONS = {
+    'experience': ['experience', 'work experience', 'employment', 'work history'],
+    'education': ['education', 'academic', 'degree'],
+    'skills': ['skills', 'technical skills', 'competencies']
+}
+
+BULLET_PATTERNS = [r'[•\-\*]\s', r'^\s*[\u2022\u2023\u2043\u204C\u204D\u2219\u25C9\u25D8\u25E6\u2619\u2765\u2767]\s']
+
+# Patterns and word lists behind the ATS sub-scores
+EMAIL_REGEX = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_REGEX = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b|\(\d{3}\)\s*\d{3}[-.]?\d{4}')
+LINKEDIN_REGEX = re.compile(r'linkedin\.com/in/[\w-]+')
+PERSONAL_EMAIL_DOMAINS = ['gmail.com', 'outlook.com', 'yahoo.com', 'protonmail.com']
+
+SPECIAL_CHARS = '@#$%^&*(){}[]|\\<>'
+SPECIAL_CHARS_REGEX = re.compile('[' + re.escape(SPECIAL_CHARS) + ']')
+
+ACTION_VERBS = [
+    'achieved', 'improved', 'developed', 'created', 'designed', 'implemented', 'managed',
+    'led', 'increased', 'reduced', 'optimized', 'built', 'launched', 'delivered',
+    'established', 'streamlined', 'automated', 'engineered', 'architected', 'spearheaded'
+]
+
+PERCENTAGE_REGEX = re.compile(r'\d+%')
+DOLLAR_REGEX = re.compile(r'\$[\d,]+')
+NUMBER_CONTEXT_REGEX = re.compile(r'\d+\s+\w+')
+METRICS_KEYWORDS = ['increased', 'decreased', 'reduced', 'improved', 'grew', 'saved']
+# A metrics keyword followed by a number on the same line
+METRICS_REGEXES = [(keyword, re.compile(rf'{keyword}.*?\d')) for keyword in METRICS_KEYWORDS]
+
+
 @dataclass
 class AnalysisResult:
     jd_skills: List[str]
@@ -90,6 +127,14 @@ class AnalysisResult:
     ats_score: int
     ats_breakdown: Dict[str, int]
     ats_recommendations: List[str]
+    # Fields produced by local rules/templates instead of the model (offline mode)
+    offline_fields: List[str] = field(default_factory=list)
+
+
+def for_stage(model, stage_name: str):
+    """Pick the model for a generation stage when `model` is a router, else use it as is."""
+    route = getattr(model, "for_stage", None)
+    return route(stage_name) if route else model
 
 
 def validate_access_code(code: str) -> bool:
@@ -101,6 +146,12 @@ def validate_access_code(code: str) -> bool:
 
 def extract_skills_with_ai(model, text: str) -> Set[str]:
     """Use AI to extract technical skills from text."""
+    return extract_skills_with_source(model, text)[0]
+
+
+def extract_skills_with_source(model, text: str) -> Tuple[Set[str], bool]:
+    """Like extract_skills_with_ai, also returning whether the skills came from the model."""
+    model = for_stage(model, "skills")
     prompt = (
         "Extract ONLY technical skills, tools, technologies, programming languages, frameworks, "
         "databases, cloud platforms, and certifications from the following text. "
@@ -112,10 +163,10 @@ def extract_skills_with_ai(model, text: str) -> Set[str]:
     try:
         response = model.generate_content(prompt)
         skills = json.loads(response.text)
-        return set(s.lower() for s in skills if isinstance(s, str))
+        return set(s.lower() for s in skills if isinstance(s, str)), True
     except Exception:
         # Fallback to regex if AI fails
-        return parse_skills_regex(text)
+        return parse_skills_regex(text), False
 
 
 def parse_skills_regex(text: str) -> Set[str]:
@@ -141,36 +192,30 @@ def load_text(path: str) -> str:
 def ensure_gemini(
     model_name: str = None, api_key_env: str = "GEMINI_API_KEY", model_env: str = "GEMINI_MODEL"
 ):
+    model = model_name or os.getenv(model_env) or "gemini-flash-latest"
+    # "fake*" models are local stand-ins for load tests, configured via FAKE_MODEL_* variables
+    if model.startswith("fake"):
+        from src.fake_model import FakeGeminiModel
+        return FakeGeminiModel.from_env(model)
     if genai is None:
         raise RuntimeError("google-generativeai is not installed. Install requirements first.")
     api_key = os.getenv(api_key_env)
     if not api_key:
         raise ValueError(f"Missing {api_key_env}. Export it or put it in a .env file.")
     genai.configure(api_key=api_key)
-    model = model_name or os.getenv(model_env) or "gemini-flash-latest"
     return genai.GenerativeModel(model)
 
 
-def rewrite_bullets(model, bullets: List[str], jd_text: str) -> List[str]:
-    if not bullets:
-        return []
-    prompt = (
-        "Rewrite each resume bullet to align with the job description. "
-        "Preserve truthfulness, keep measurable outcomes, and keep each bullet concise.\n\n"
-        f"Job description:\n{jd_text}\n\n"
-        "Resume bullets (JSON array):\n"
-        f"{json.dumps(bullets, indent=2)}\n\n"
-        "Respond with a JSON array of rewritten bullets."
+def rewrite_bullets(model, bullets: List[str], jd_text: str, fingerprint: Optional[str] = None,
+                    stats: Optional[RewriteStats] = None) -> List[str]:
+    """Rewrite bullets against the JD. Output is index-aligned with the input bullets."""
+    return rewrite_bullets_parallel(
+        for_stage(model, "rewrite_bullets"), bullets, jd_text, fingerprint=fingerprint, stats=stats
     )
-    response = model.generate_content(prompt)
-    try:
-        return json.loads(response.text)
-    except Exception:
-        # Fall back to splitting lines if JSON is malformed
-        return [line.strip("-• ").strip() for line in response.text.strip().splitlines() if line.strip()]
 
 
 def generate_cover_letter(model, resume_text: str, jd_text: str) -> str:
+    model = for_stage(model, "cover_letter")
     prompt = (
         "Write a professional, tailored cover letter in 250-300 words. "
         "Use a confident, engaging tone in first person. "
@@ -187,6 +232,7 @@ def generate_cover_letter(model, resume_text: str, jd_text: str) -> str:
 
 
 def generate_tailored_resume(model, resume_text: str, jd_text: str) -> str:
+    model = for_stage(model, "tailored_resume")
     prompt = (
         "Rewrite the entire resume to better match the job description. "
         "Optimize the summary, skills, and experience sections. "
@@ -201,69 +247,88 @@ def generate_tailored_resume(model, resume_text: str, jd_text: str) -> str:
     return response.text.strip()
 
 
-def check_standard_sections(resume_text: str) -> int:
+class ResumeText:
+    """Resume text with the lowercased text and the lines the ATS checks share.
+
+    Built once per score so the checks don't each lower and split the text again.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.lines = text.split('\n')
+        self.lower_lines = self.lower.split('\n')
+
+
+def as_resume_text(resume_text: Union[str, ResumeText]) -> ResumeText:
+    return resume_text if isinstance(resume_text, ResumeText) else ResumeText(resume_text)
+
+
+def section_points(critical_found: int) -> int:
+    """Score for the number of critical sections that have content. Returns score 0-15."""
+    score = critical_found * 5
+    # Penalty if missing critical sections
+    if critical_found < 2:
+        score = max(0, score - 5)
+    return min(15, score)
+
+
+def check_standard_sections(resume_text: Union[str, ResumeText]) -> int:
     """Check for presence and quality of standard resume sections. Returns score 0-15."""
-    score = 0
-    text_lower = resume_text.lower()
-    lines = resume_text.split('\n')
+    # Deliberately keyword matching over the raw text, not resume_parser's detected
+    # sections: ScoringSession mirrors this line by line, and scores stay comparable
+    # with earlier runs and cached results
+    resume = as_resume_text(resume_text)
+    lines = resume.lines
     
     # Critical sections (must have at least 2 of these)
-    critical_sections = {
-        'experience': ['experience', 'work experience', 'employment', 'work history'],
-        'education': ['education', 'academic', 'degree'],
-        'skills': ['skills', 'technical skills', 'competencies']
-    }
-    
     critical_found = 0
-    for section_type, keywords in critical_sections.items():
+    for section_type, keywords in CRITICAL_SECTIONS.items():
         for keyword in keywords:
-            if keyword in text_lower:
+            if keyword in resume.lower:
                 # Check if there's actual content after the section header
-                for i, line in enumerate(lines):
-                    if keyword in line.lower() and i + 1 < len(lines):
+                for i, line in enumerate(resume.lower_lines):
+                    if keyword in line and i + 1 < len(lines):
                         # Check next few lines have content (not just another header)
                         has_content = any(len(lines[j].strip()) > 20 for j in range(i+1, min(i+4, len(lines))))
                         if has_content:
                             critical_found += 1
-                            score += 5
                             break
                 break
     
-    # Penalty if missing critical sections
-    if critical_found < 2:
-        score = max(0, score - 5)
-    
-    return min(15, score)
+    return section_points(critical_found)
 
 
-def check_contact_info(resume_text: str) -> int:
-    """Check for email, phone, and LinkedIn. Returns score 0-10."""
+def contact_points(email: Optional[str], has_phone: bool, has_linkedin: bool) -> int:
+    """Score for the contact details found. Returns score 0-10."""
     score = 0
-    
-    # Check for email pattern
-    email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', resume_text)
-    if email_match:
-        email = email_match.group(0).lower()
+    if email:
         # Bonus for professional email domains
-        if any(domain in email for domain in ['gmail.com', 'outlook.com', 'yahoo.com', 'protonmail.com']):
+        if any(domain in email.lower() for domain in PERSONAL_EMAIL_DOMAINS):
             score += 4
         else:
             score += 3  # Custom domain (could be professional or not)
-    
-    # Check for phone pattern
-    if re.search(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b|\(\d{3}\)\s*\d{3}[-.]?\d{4}', resume_text):
+    if has_phone:
         score += 4
-    
     # Bonus for LinkedIn
-    if re.search(r'linkedin\.com/in/[\w-]+', resume_text.lower()):
+    if has_linkedin:
         score += 2
-    
     return min(10, score)
 
 
-def check_resume_length(resume_text: str) -> int:
-    """Check resume length with stricter criteria. Returns score 0-8."""
-    word_count = len(resume_text.split())
+def check_contact_info(resume_text: Union[str, ResumeText]) -> int:
+    """Check for email, phone, and LinkedIn. Returns score 0-10."""
+    resume = as_resume_text(resume_text)
+    email_match = EMAIL_REGEX.search(resume.text)
+    return contact_points(
+        email_match.group(0) if email_match else None,
+        bool(PHONE_REGEX.search(resume.text)),
+        bool(LINKEDIN_REGEX.search(resume.lower)),
+    )
+
+
+def length_points(word_count: int) -> int:
+    """Score for a resume's word count. Returns score 0-8."""
     # Stricter ideal range: 450-700 words
     if 450 <= word_count <= 700:
         return 8
@@ -277,52 +342,55 @@ def check_resume_length(resume_text: str) -> int:
         return 0  # Too short or too long
 
 
-def check_format_quality(resume_text: str) -> int:
-    """Check resume formatting quality. Returns score 0-15."""
+def check_resume_length(resume_text: Union[str, ResumeText]) -> int:
+    """Check resume length with stricter criteria. Returns score 0-8."""
+    return length_points(len(as_resume_text(resume_text).text.split()))
+
+
+def format_points(has_bullets: bool, special_char_count: int, text_length: int, line_count: int,
+                  all_caps_lines: int, all_lower_lines: int, triple_blank_count: int) -> int:
+    """Score formatting from counts over the resume text. Returns score 0-15."""
     score = 15  # Start with full points, deduct for issues
     
-    # Check for bullet points (good formatting)
-    bullet_patterns = [r'[•\-\*]\s', r'^\s*[\u2022\u2023\u2043\u204C\u204D\u2219\u25C9\u25D8\u25E6\u2619\u2765\u2767]\s']
-    has_bullets = any(re.search(pattern, resume_text, re.MULTILINE) for pattern in bullet_patterns)
+    # Bullet points are good formatting
     if not has_bullets:
         score -= 3
     
-    # Check for excessive special characters (messy formatting)
-    special_char_count = sum(1 for char in resume_text if char in '@#$%^&*(){}[]|\\<>')
-    if special_char_count > len(resume_text) * 0.02:  # More than 2% special chars
+    # Excessive special characters (messy formatting)
+    if special_char_count > text_length * 0.02:  # More than 2% special chars
         score -= 3
     
-    # Check for proper capitalization (not all caps or all lowercase)
-    lines = [line.strip() for line in resume_text.split('\n') if line.strip()]
-    if lines:
-        all_caps_lines = sum(1 for line in lines if line.isupper() and len(line) > 10)
-        all_lower_lines = sum(1 for line in lines if line.islower() and len(line) > 10)
-        
-        if all_caps_lines > len(lines) * 0.3:  # More than 30% all caps
+    # Proper capitalization (not all caps or all lowercase)
+    if line_count:
+        if all_caps_lines > line_count * 0.3:  # More than 30% all caps
             score -= 4
-        if all_lower_lines > len(lines) * 0.3:  # More than 30% all lowercase
+        if all_lower_lines > line_count * 0.3:  # More than 30% all lowercase
             score -= 4
     
-    # Check for consistent spacing (not too many blank lines)
-    blank_lines = resume_text.count('\n\n\n')
-    if blank_lines > 5:
+    # Consistent spacing (not too many blank lines)
+    if triple_blank_count > 5:
         score -= 2
     
     return max(0, score)
 
 
-def check_action_verbs(resume_text: str) -> int:
-    """Check for strong action verbs. Returns score 0-7."""
-    action_verbs = [
-        'achieved', 'improved', 'developed', 'created', 'designed', 'implemented', 'managed',
-        'led', 'increased', 'reduced', 'optimized', 'built', 'launched', 'delivered',
-        'established', 'streamlined', 'automated', 'engineered', 'architected', 'spearheaded'
-    ]
-    
-    text_lower = resume_text.lower()
-    found_verbs = sum(1 for verb in action_verbs if verb in text_lower)
-    
-    # Score based on number of action verbs found
+def check_format_quality(resume_text: Union[str, ResumeText]) -> int:
+    """Check resume formatting quality. Returns score 0-15."""
+    resume = as_resume_text(resume_text)
+    text = resume.text
+    has_bullets = any(re.search(pattern, text, re.MULTILINE) for pattern in BULLET_PATTERNS)
+    special_char_count = len(SPECIAL_CHARS_REGEX.findall(text))
+    lines = [line for line in map(str.strip, resume.lines) if line]
+    all_caps_lines = sum(1 for line in lines if line.isupper() and len(line) > 10)
+    all_lower_lines = sum(1 for line in lines if line.islower() and len(line) > 10)
+    return format_points(
+        has_bullets, special_char_count, len(text), len(lines),
+        all_caps_lines, all_lower_lines, text.count('\n\n\n'),
+    )
+
+
+def action_verb_points(found_verbs: int) -> int:
+    """Score for the number of distinct action verbs used. Returns score 0-7."""
     if found_verbs >= 8:
         return 7
     elif found_verbs >= 5:
@@ -335,33 +403,90 @@ def check_action_verbs(resume_text: str) -> int:
         return 0
 
 
-def check_quantifiable_achievements(resume_text: str) -> int:
-    """Check for quantifiable achievements (numbers, percentages, metrics). Returns score 0-10."""
-    score = 0
-    
-    # Check for percentages
-    percentage_count = len(re.findall(r'\d+%', resume_text))
-    score += min(3, percentage_count)
-    
-    # Check for dollar amounts
-    dollar_count = len(re.findall(r'\$[\d,]+', resume_text))
+def check_action_verbs(resume_text: Union[str, ResumeText]) -> int:
+    """Check for strong action verbs. Returns score 0-7."""
+    text_lower = as_resume_text(resume_text).lower
+    return action_verb_points(sum(1 for verb in ACTION_VERBS if verb in text_lower))
+
+
+def achievement_points(percentage_count: int, dollar_count: int, number_context: int,
+                       metrics_with_numbers: int) -> int:
+    """Score quantified achievements from match counts. Returns score 0-10."""
+    score = min(3, percentage_count)
     score += min(2, dollar_count)
-    
-    # Check for numbers with context (e.g., "20 projects", "500 users")
-    number_context = len(re.findall(r'\d+\s+\w+', resume_text))
     score += min(3, number_context // 2)
-    
-    # Check for metrics keywords
-    metrics_keywords = ['increased', 'decreased', 'reduced', 'improved', 'grew', 'saved']
-    metrics_with_numbers = sum(1 for keyword in metrics_keywords 
-                               if re.search(rf'{keyword}.*?\d+', resume_text.lower()))
     score += min(2, metrics_with_numbers)
-    
     return min(10, score)
 
 
+def count_percentages(text: str) -> int:
+    """Number of PERCENTAGE_REGEX matches, found from the "%" signs instead of scanning every digit."""
+    count, i = 0, text.find('%')
+    while i != -1:
+        if i and text[i - 1].isdecimal():
+            count += 1
+        i = text.find('%', i + 1)
+    return count
+
+
+def check_quantifiable_achievements(resume_text: Union[str, ResumeText]) -> int:
+    """Check for quantifiable achievements (numbers, percentages, metrics). Returns score 0-10."""
+    resume = as_resume_text(resume_text)
+    return achievement_points(
+        count_percentages(resume.text),
+        len(DOLLAR_REGEX.findall(resume.text)),
+        # Numbers with context (e.g., "20 projects", "500 users")
+        len(NUMBER_CONTEXT_REGEX.findall(resume.text)),
+        sum(1 for keyword, pattern in METRICS_REGEXES if keyword in resume.lower and pattern.search(resume.lower)),
+    )
+
+
+def keyword_points(matched: int, jd_skill_count: int) -> tuple:
+    """Score how many JD skills the resume matches. Returns (score 0-40, match fraction)."""
+    keyword_match = matched / jd_skill_count if jd_skill_count else 0
+    return int(keyword_match * 40), keyword_match
+
+
+# Maximum points per breakdown category, used to rank the weakest areas
+BREAKDOWN_MAX = {
+    "keywords": 40,
+    "sections": 15,
+    "contact": 10,
+    "format": 15,
+    "length": 8,
+    "action_verbs": 7,
+    "achievements": 10,
+}
+
+
+def rule_based_recommendations(score_data: dict, missing_skills: Optional[List[str]] = None) -> List[str]:
+    """Deterministic recommendations from the score breakdown, weakest areas first."""
+    breakdown = score_data['breakdown']
+    recs = []
+    if breakdown['keywords'] < 25:
+        rec = "Add more keywords from the job description to your resume"
+        if missing_skills:
+            rec += f", such as {', '.join(missing_skills[:5])}"
+        recs.append(("keywords", rec))
+    if breakdown['sections'] < 15:
+        recs.append(("sections", "Use standard section headers like 'Experience', 'Education', 'Skills'"))
+    if breakdown['contact'] < 8:
+        recs.append(("contact", "Ensure your email and phone number are clearly visible"))
+    if breakdown['format'] < 12:
+        recs.append(("format", "Use bullet points, consistent capitalization and fewer special characters"))
+    if breakdown['length'] < 6:
+        recs.append(("length", "Aim for roughly 450-700 words so the resume is complete but concise"))
+    if breakdown['action_verbs'] < 5:
+        recs.append(("action_verbs", "Start bullets with strong action verbs like 'led', 'built' or 'delivered'"))
+    if breakdown['achievements'] < 6:
+        recs.append(("achievements", "Quantify results with numbers, percentages or dollar amounts"))
+    recs.sort(key=lambda item: breakdown[item[0]] / BREAKDOWN_MAX[item[0]])
+    return [rec for _, rec in recs[:5]]
+
+
 def generate_ats_recommendations(model, resume_text: str, jd_text: str, score_data: dict) -> List[str]:
     """Generate AI-powered ATS improvement recommendations."""
+    model = for_stage(model, "ats_recommendations")
     prompt = (
         f"Analyze this resume's ATS compatibility score of {score_data['total_score']}/100.\n\n"
         f"Score breakdown:\n"
@@ -381,21 +506,15 @@ def generate_ats_recommendations(model, resume_text: str, jd_text: str, score_da
         return recommendations if isinstance(recommendations, list) else []
     except Exception:
         # Fallback recommendations
-        recs = []
-        if score_data['breakdown']['keywords'] < 25:
-            recs.append("Add more keywords from the job description to your resume")
-        if score_data['breakdown']['sections'] < 15:
-            recs.append("Use standard section headers like 'Experience', 'Education', 'Skills'")
-        if score_data['breakdown']['contact'] < 8:
-            recs.append("Ensure your email and phone number are clearly visible")
-        return recs[:5]
+        return rule_based_recommendations(score_data)
 
 
-def calculate_ats_score(model, resume_text: str, jd_text: str, jd_skills: Set[str], resume_skills: Set[str]) -> dict:
-    """Calculate overall ATS compatibility score with strict criteria."""
+def score_ats(resume_text: Union[str, ResumeText], jd_skills: Set[str], resume_skills: Set[str]) -> dict:
+    """Score ATS compatibility locally. Returns total_score, keyword_match_percentage and breakdown."""
+    resume_text = as_resume_text(resume_text)
+
     # 1. Keyword match score (0-40 points) - Most important
-    keyword_match = len(jd_skills & resume_skills) / len(jd_skills) if jd_skills else 0
-    keyword_score = int(keyword_match * 40)
+    keyword_score, keyword_match = keyword_points(len(jd_skills & resume_skills), len(jd_skills))
     
     # 2. Section score (0-15 points) - Stricter validation
     section_score = check_standard_sections(resume_text)
@@ -419,7 +538,7 @@ def calculate_ats_score(model, resume_text: str, jd_text: str, jd_skills: Set[st
     total_score = (keyword_score + section_score + contact_score + format_score + 
                    length_score + action_verbs_score + achievements_score)
     
-    score_data = {
+    return {
         "total_score": min(100, total_score),
         "keyword_match_percentage": int(keyword_match * 100),
         "breakdown": {
@@ -432,8 +551,14 @@ def calculate_ats_score(model, resume_text: str, jd_text: str, jd_skills: Set[st
             "achievements": achievements_score
         }
     }
-    
-    recommendations = generate_ats_recommendations(model, resume_text, jd_text, score_data)
+
+
+def calculate_ats_score(model, resume_text: str, jd_text: str, jd_skills: Set[str], resume_skills: Set[str]) -> dict:
+    """Calculate overall ATS compatibility score with strict criteria."""
+    score_data = score_ats(resume_text, jd_skills, resume_skills)
+
+    with stage("ats_recommendations"):
+        recommendations = generate_ats_recommendations(model, resume_text, jd_text, score_data)
     
     return {
         "score": score_data["total_score"],
@@ -442,22 +567,52 @@ def calculate_ats_score(model, resume_text: str, jd_text: str, jd_skills: Set[st
     }
 
 
-def analyze(resume_text: str, jd_text: str, bullets: List[str]) -> AnalysisResult:
-    model = ensure_gemini()
+def analyze(resume_text: str, jd_text: str, bullets: Optional[List[str]] = None, model=None) -> AnalysisResult:
+    if model is None:
+        from src.model_router import get_router
+        model = get_router()
+
+    # Pull bullets out of the resume itself when the caller doesn't supply any
+    if bullets is None:
+        with stage("parse_resume"):
+            from src.resume_parser import parse_resume
+            bullets = parse_resume(resume_text).experience_bullets
     
+    # Near-duplicate JDs (re-listed postings) reuse the skills and bullet rewrites of the closest match
+    from src.jd_dedup import get_jd_index
+    jd_index = get_jd_index()
+    jd_key = jd_index.key(jd_text)
+    jd_match = jd_index.lookup(jd_key)
+
     # Use AI-powered skill extraction for better accuracy
-    jd_skills = extract_skills_with_ai(model, jd_text)
-    resume_skills = extract_skills_with_ai(model, resume_text)
+    with stage("skills"):
+        if jd_match:
+            jd_skills = set(jd_match.entry.skills)
+            jd_index.record_saved("skills", 1)
+        else:
+            jd_skills, from_model = extract_skills_with_source(model, jd_text)
+            # Regex fallback skills are noisy; don't let one failed call pin them for every near-duplicate
+            if from_model:
+                jd_index.add(jd_key, jd_skills)
+        resume_skills = extract_skills_with_ai(model, resume_text)
     missing = sorted(jd_skills - resume_skills)
     overlap = sorted(jd_skills & resume_skills)
 
     # Model already initialized above
-    rewritten = rewrite_bullets(model, bullets, jd_text)
-    cover_letter = generate_cover_letter(model, resume_text, jd_text)
-    tailored_resume = generate_tailored_resume(model, resume_text, jd_text)
+    with stage("rewrite_bullets"):
+        rewrite_stats = RewriteStats()
+        fingerprint = jd_match.entry.fingerprint if jd_match else None
+        rewritten = rewrite_bullets(model, bullets, jd_text, fingerprint=fingerprint, stats=rewrite_stats)
+        if jd_match and not jd_match.exact:
+            jd_index.record_saved("rewrite_bullets", rewrite_stats.calls_saved)
+    with stage("cover_letter"):
+        cover_letter = generate_cover_letter(model, resume_text, jd_text)
+    with stage("tailored_resume"):
+        tailored_resume = generate_tailored_resume(model, resume_text, jd_text)
     
     # Calculate ATS score
-    ats_data = calculate_ats_score(model, resume_text, jd_text, jd_skills, resume_skills)
+    with stage("ats_score"):
+        ats_data = calculate_ats_score(model, resume_text, jd_text, jd_skills, resume_skills)
 
     return AnalysisResult(
         jd_skills=sorted(jd_skills),
@@ -476,11 +631,21 @@ def analyze(resume_text: str, jd_text: str, bullets: List[str]) -> AnalysisResul
 def run_cli(args: argparse.Namespace):
     jd_text = load_text(args.jd)
     resume_text = load_text(args.resume)
-    bullets = [b.strip() for b in args.bullets] if args.bullets else []
+    bullets = [b.strip() for b in args.bullets] if args.bullets else None
+
+    # Profile files go next to the JSON output, or in the working directory for stdout
+    profile_prefix = f"{os.path.splitext(args.output or 'agent')[0]}.profile"
 
     try:
-        result = analyze(resume_text, jd_text, bullets)
+        with RunProfiler(profile_prefix) if args.profile else nullcontext() as profiler:
+            if args.offline:
+                from src.offline import analyze_offline
+                result = analyze_offline(resume_text, jd_text, bullets, drafts=args.drafts)
+            else:
+                result = analyze(resume_text, jd_text, bullets)
         output = asdict(result)
+        if profiler is not None:
+            print(f"Profile written to {', '.join(profiler.files)}", file=sys.stderr)
 
         if args.output:
             with open(args.output, "w", encoding="utf-8") as f:
@@ -500,9 +665,25 @@ def build_parser() -> argparse.ArgumentParser:
         "--bullets",
         nargs="*",
         default=[],
-        help="Optional list of resume bullets to rewrite (pass each bullet as a separate argument)",
+        help="Optional list of resume bullets to rewrite (pass each bullet as a separate argument). "
+        "Defaults to the bullets extracted from the resume",
     )
     parser.add_argument("--output", help="Path to write JSON output (stdout if omitted)")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a CPU profile, stage timings and allocation stats next to the JSON output",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Score without calling the model: local skill extraction and rule-based recommendations",
+    )
+    parser.add_argument(
+        "--drafts",
+        action="store_true",
+        help="With --offline, also produce template bullet and cover-letter drafts",
+    )
     return parser
 
 
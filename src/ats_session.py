@@ -0,0 +1,335 @@
+import re
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from src.agent import (
+    ACTION_VERBS, BULLET_PATTERNS, CRITICAL_SECTIONS, DOLLAR_REGEX, EMAIL_REGEX, LINKEDIN_REGEX,
+    METRICS_KEYWORDS, NUMBER_CONTEXT_REGEX, PERCENTAGE_REGEX, PHONE_REGEX, SPECIAL_CHARS,
+    achievement_points, action_verb_points, contact_points, format_points, keyword_points,
+    length_points, section_points,
+)
+
+SECTION_TERMS = [k for keywords in CRITICAL_SECTIONS.values() for k in keywords]
+METRICS_REGEXES = {k: re.compile(rf'{k}.*?\d+') for k in METRICS_KEYWORDS}
+BULLET_REGEXES = [re.compile(p, re.MULTILINE) for p in BULLET_PATTERNS]
+FIRST_TOKEN_REGEX = re.compile(r'\s*\w+')
+TRAILING_NUMBER_REGEX = re.compile(r'\d+\s*$')
+
+
+SkillPattern = Tuple[str, str, "re.Pattern"]
+
+
+def skill_patterns(jd_skills: Iterable[str]) -> List[SkillPattern]:
+    """(skill, first word, pattern) per JD skill. Skills are phrases ("spring boot",
+    "react.js", "c++") matched case-insensitively on word boundaries within a line,
+    like the multi-word skills in offline.py."""
+    patterns = []
+    for skill in sorted({' '.join(s.lower().split()) for s in jd_skills} - {''}):
+        words = skill.split()
+        phrase = r'[ \t]+'.join(re.escape(word) for word in words)
+        patterns.append((skill, words[0], re.compile(rf'(?<!\w){phrase}(?!\w)')))
+    return patterns
+
+
+def match_skills(text: str, patterns: List[SkillPattern]) -> FrozenSet[str]:
+    """JD skills found in `text` by skill_patterns()."""
+    lower = text.lower()
+    return frozenset(skill for skill, first, pattern in patterns if first in lower and pattern.search(lower))
+
+
+def _number_context_scan(text: str) -> Tuple[int, bool]:
+    """Count NUMBER_CONTEXT_REGEX matches and report whether trailing digits are left
+    unconsumed, in which case the full-text scan continues the match onto the next line."""
+    count, end = 0, 0
+    for m in NUMBER_CONTEXT_REGEX.finditer(text):
+        count += 1
+        end = m.end()
+    return count, bool(TRAILING_NUMBER_REGEX.search(text, end))
+
+
+@dataclass(frozen=True)
+class LineFeatures:
+    """Everything the ATS sub-scores need to know about one line."""
+    text: str
+    blank: bool
+    long: bool
+    words: int
+    skills: FrozenSet[str]
+    section_terms: FrozenSet[str]
+    email: Optional[str]
+    phone: bool
+    linkedin: bool
+    # Bullet patterns end in \s, which can be the newline after the line
+    bullet_mid: bool
+    bullet_last: bool
+    special_chars: int
+    nonblank: bool
+    all_caps: bool
+    all_lower: bool
+    verbs: FrozenSet[str]
+    percentages: int
+    dollars: int
+    # NUMBER_CONTEXT_REGEX's \s+ can cross line breaks ("May 2020\nREVA"), so keep
+    # (count, trailing digits) both for a fresh scan and for one whose first token
+    # was consumed by a match from the previous line
+    number_context: Tuple[Tuple[int, bool], Tuple[int, bool]]
+    starts_with_word: bool
+    whitespace_only: bool
+    metrics: FrozenSet[str]
+
+
+def line_features(line: str, patterns: List[SkillPattern] = ()) -> LineFeatures:
+    stripped = line.strip()
+    lower = line.lower()
+    email = EMAIL_REGEX.search(line)
+    first_token = FIRST_TOKEN_REGEX.match(line)
+    after_first = line[first_token.end():] if first_token else line
+    return LineFeatures(
+        text=line,
+        blank=line == '',
+        long=len(stripped) > 20,
+        words=len(line.split()),
+        skills=match_skills(line, patterns),
+        section_terms=frozenset(t for t in SECTION_TERMS if t in lower),
+        email=email.group(0) if email else None,
+        phone=bool(PHONE_REGEX.search(line)),
+        linkedin=bool(LINKEDIN_REGEX.search(lower)),
+        bullet_mid=any(r.search(line + '\n') for r in BULLET_REGEXES),
+        bullet_last=any(r.search(line) for r in BULLET_REGEXES),
+        special_chars=sum(1 for char in line if char in SPECIAL_CHARS),
+        nonblank=bool(stripped),
+        all_caps=stripped.isupper() and len(stripped) > 10,
+        all_lower=stripped.islower() and len(stripped) > 10,
+        verbs=frozenset(v for v in ACTION_VERBS if v in lower),
+        percentages=len(PERCENTAGE_REGEX.findall(line)),
+        dollars=len(DOLLAR_REGEX.findall(line)),
+        number_context=(_number_context_scan(line), _number_context_scan(after_first)),
+        starts_with_word=first_token is not None,
+        whitespace_only=not stripped,
+        metrics=frozenset(k for k, r in METRICS_REGEXES.items() if r.search(lower)),
+    )
+
+
+_COUNTS = ('words', 'special_chars', 'nonblank', 'all_caps', 'all_lower', 'percentages',
+           'dollars', 'bullet_mid', 'phone', 'linkedin')
+
+
+class ScoringSession:
+    """Incremental ATS scorer for interactive line-level edits.
+
+    Keeps per-line features and running totals, so an edit only re-extracts
+    the edited lines. Scores use the same point functions as
+    calculate_ats_score and never call the model. A JD skill counts as matched
+    while any line contains it as a phrase (see skill_patterns), so AI-extracted
+    skills like "spring boot" match as in analyze(). Apart from the phone pattern,
+    which is matched within a line, the other sub-scores equal the check_*
+    functions on the full text.
+    """
+
+    def __init__(self, resume_text: str, jd_skills: Iterable[str]):
+        self.patterns = skill_patterns(jd_skills)
+        self.jd_skills = frozenset(skill for skill, _, _ in self.patterns)
+        self.lines: List[LineFeatures] = []
+        self.totals: Counter = Counter()
+        self.skills: Counter = Counter()
+        self.verbs: Counter = Counter()
+        self.metrics: Counter = Counter()
+        self.matched_skills = 0
+        self.text_length = -1
+        self._cached: Dict[str, int] = {}
+        self._splice(0, 0, [line_features(line, self.patterns) for line in resume_text.split('\n')])
+        self.breakdown = self._compute(dirty_layout=True)
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(f.text for f in self.lines)
+
+    @property
+    def score(self) -> int:
+        return min(100, sum(self.breakdown.values()))
+
+    def result(self) -> dict:
+        return {"score": self.score, "breakdown": dict(self.breakdown)}
+
+    # --- Edits --------------------------------------------------------
+
+    def replace_lines(self, start: int, end: int, text: str) -> dict:
+        """Replace lines[start:end] with `text` (which may hold several lines, or none if
+        the edit is a pure deletion with text=None) and return the new score with deltas."""
+        if not 0 <= start <= end <= len(self.lines):
+            raise IndexError(f"Line range {start}:{end} outside 0:{len(self.lines)}")
+        new = [] if text is None else [line_features(line, self.patterns) for line in text.split('\n')]
+        if not new and start == 0 and end == len(self.lines):
+            new = [line_features('', self.patterns)]
+        old = self.lines[start:end]
+        dirty_layout = len(old) != len(new) or any(
+            f.section_terms or f.long or f.blank or f.email for f in old + new
+        )
+
+        before = self.result()
+        self._splice(start, end, new)
+        self.breakdown = self._compute(dirty_layout)
+        after = self.result()
+        after["delta"] = after["score"] - before["score"]
+        after["breakdown_delta"] = {
+            k: after["breakdown"][k] - before["breakdown"][k] for k in after["breakdown"]
+        }
+        return after
+
+    def set_line(self, index: int, text: str) -> dict:
+        return self.replace_lines(index, index + 1, text)
+
+    def insert_line(self, index: int, text: str) -> dict:
+        return self.replace_lines(index, index, text)
+
+    def delete_line(self, index: int) -> dict:
+        return self.replace_lines(index, index + 1, None)
+
+    def apply_edits(self, edits: Iterable[Tuple[int, int, Optional[str]]]) -> dict:
+        """Apply (start, end, text) replace_lines edits in order, all or nothing.
+
+        Each range refers to the lines left by the edits before it. Every range is
+        checked before any edit is applied, so a bad one raises IndexError and
+        leaves the session unchanged.
+        """
+        edits = list(edits)
+        count = len(self.lines)
+        for start, end, text in edits:
+            if not 0 <= start <= end <= count:
+                raise IndexError(f"Line range {start}:{end} outside 0:{count}")
+            count += (0 if text is None else text.count('\n') + 1) - (end - start)
+            # Deleting every line leaves one empty line, as in replace_lines
+            count = max(count, 1)
+        for start, end, text in edits:
+            self.replace_lines(start, end, text)
+        return self.result()
+
+    # --- Internals ----------------------------------------------------
+
+    def _splice(self, start: int, end: int, new: List[LineFeatures]):
+        for f in self.lines[start:end]:
+            self._account(f, -1)
+        for f in new:
+            self._account(f, +1)
+        self.lines[start:end] = new
+        self.text_length += len(new) - (end - start)
+
+    def _account(self, f: LineFeatures, sign: int):
+        for name in _COUNTS:
+            self.totals[name] += sign * int(getattr(f, name))
+        self.text_length += sign * len(f.text)
+        for skill in f.skills:
+            self.skills[skill] += sign
+            count = self.skills[skill]
+            if skill in self.jd_skills and count == (1 if sign > 0 else 0):
+                self.matched_skills += sign
+            if count == 0:
+                del self.skills[skill]
+        for counter, items in ((self.verbs, f.verbs), (self.metrics, f.metrics)):
+            for item in items:
+                counter[item] += sign
+                if counter[item] == 0:
+                    del counter[item]
+
+    def _compute(self, dirty_layout: bool) -> Dict[str, int]:
+        # Sections, first email and blank-line runs depend on line positions;
+        # recompute them from cached features only when the edit could move them
+        if dirty_layout or not self._cached:
+            self._cached = {
+                "sections": self._section_score(),
+                "email": self._first_email(),
+                "triple_blanks": self._triple_blank_count(),
+            }
+
+        keyword_score, _ = keyword_points(self.matched_skills, len(self.jd_skills))
+        last = self.lines[-1]
+        has_bullets = (self.totals['bullet_mid'] - int(last.bullet_mid) + int(last.bullet_last)) > 0
+        return {
+            "keywords": keyword_score,
+            "sections": self._cached["sections"],
+            "contact": contact_points(
+                self._cached["email"], self.totals['phone'] > 0, self.totals['linkedin'] > 0
+            ),
+            "format": format_points(
+                has_bullets, self.totals['special_chars'], self.text_length, self.totals['nonblank'],
+                self.totals['all_caps'], self.totals['all_lower'], self._cached["triple_blanks"],
+            ),
+            "length": length_points(self.totals['words']),
+            "action_verbs": action_verb_points(len(self.verbs)),
+            "achievements": achievement_points(
+                self.totals['percentages'], self.totals['dollars'],
+                self._number_context_count(), len(self.metrics),
+            ),
+        }
+
+    def _section_score(self) -> int:
+        # Mirrors check_standard_sections over cached per-line features
+        lines = self.lines
+        critical_found = 0
+        for keywords in CRITICAL_SECTIONS.values():
+            for keyword in keywords:
+                header_lines = [i for i, f in enumerate(lines) if keyword in f.section_terms]
+                if not header_lines:
+                    continue
+                if any(
+                    any(lines[j].long for j in range(i + 1, min(i + 4, len(lines))))
+                    for i in header_lines
+                ):
+                    critical_found += 1
+                break
+        return section_points(critical_found)
+
+    def _number_context_count(self) -> int:
+        # Replays the full-text scan over cached per-line results
+        count, carry = 0, False
+        for f in self.lines:
+            mode = 0
+            if carry:
+                if f.whitespace_only:
+                    continue
+                if f.starts_with_word:
+                    count += 1
+                    mode = 1
+            line_count, carry = f.number_context[mode]
+            count += line_count
+        return count
+
+    def _first_email(self) -> Optional[str]:
+        return next((f.email for f in self.lines if f.email), None)
+
+    def _triple_blank_count(self) -> int:
+        # Same as text.count('\n\n\n'): each run of n consecutive newlines holds n // 3
+        count = run = 0
+        for f in self.lines[1:]:
+            run += 1
+            if not f.blank:
+                count += run // 3
+                run = 0
+        return count + run // 3
+
+
+class SessionStore:
+    """Thread-safe LRU of scoring sessions keyed by a random id."""
+
+    def __init__(self, max_sessions: int = 1000):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ScoringSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, session: ScoringSession) -> str:
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id
+
+    def get(self, session_id: str) -> Optional[ScoringSession]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Documents rendered ahead of the one being written. Memory stays at a few DOCX
+# files plus a small central-directory record per entry, however large the archive.
+EXPORT_WINDOW = 4
+MAX_EXPORT_DOCUMENTS = 500
+MAX_DOCUMENT_CHARS = 50000
+# Longest a streamed document waits for pool capacity before the download is ended
+EXPORT_MAX_WAIT = 30.0
+
+ENTRY_NAME_REGEX = re.compile(r"[^A-Za-z0-9._-]+")
+EXTENSION_REGEX = re.compile(r"\.(docx|md|markdown|txt)$", re.IGNORECASE)
+
+
+@dataclass
+class ExportDocument:
+    name: str
+    text: str
+
+
+def entry_name(name: str, used: Set[str]) -> str:
+    """Safe, unique .docx file name for a ZIP entry. Path separators become "_"."""
+    stem = ENTRY_NAME_REGEX.sub("_", EXTENSION_REGEX.sub("", name)).strip("._") or "document"
+    candidate, n = f"{stem}.docx", 2
+    while candidate in used:
+        candidate, n = f"{stem}_{n}.docx", n + 1
+    used.add(candidate)
+    return candidate
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the ZIP streamer.
+
+    It has no tell()/seek(), so zipfile writes data descriptors after each entry
+    instead of seeking back, which is what lets the archive be streamed.
+    """
+
+    def __init__(self):
+        self._chunks: deque = deque()
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        while self._chunks:
+            yield self._chunks.popleft()
+
+
+class ZipStreamer:
+    """Builds a ZIP archive entry by entry, returning the bytes produced by each step.
+
+    DOCX files are already deflate-compressed, so entries are stored as they are.
+    """
+
+    def __init__(self):
+        self._sink = _ChunkSink()
+        self._archive = zipfile.ZipFile(self._sink, mode="w", compression=zipfile.ZIP_STORED)
+        self.entries = 0
+
+    def add(self, name: str, data: bytes) -> bytes:
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        self._archive.writestr(info, data)
+        self.entries += 1
+        return b"".join(self._sink.drain())
+
+    def close(self) -> bytes:
+        self._archive.close()
+        return b"".join(self._sink.drain())
+
+
+def _render_docx(text: str) -> bytes:
+    # Imported here so the module loads without python-docx; runs in worker processes
+    from src.docx_utils import markdown_to_docx_bytes
+    return markdown_to_docx_bytes(text)
+
+
+def render_ordered(executor: Executor, documents: Iterable[ExportDocument],
+                   render: Callable[[str], bytes] = _render_docx,
+                   window: int = EXPORT_WINDOW) -> Iterator[Tuple[ExportDocument, bytes]]:
+    """Render documents on `executor`, keeping at most `window` in flight, in input order."""
+    pending: deque = deque()
+    for document in documents:
+        pending.append((document, executor.submit(render, document.text)))
+        if len(pending) >= window:
+            done, future = pending.popleft()
+            yield done, future.result()
+    while pending:
+        done, future = pending.popleft()
+        yield done, future.result()
+
+
+async def open_zip_stream(documents: List[ExportDocument], run: Callable,
+                          render: Callable[[str], bytes] = _render_docx,
+                          window: int = EXPORT_WINDOW, retry_delay: float = 0.05,
+                          max_wait: float = EXPORT_MAX_WAIT) -> AsyncIterator[bytes]:
+    """Start an archive for the API and return an async iterator of its bytes.
+
+    `run` is an awaitable runner such as execution.run_cpu. The first document is
+    rendered before this returns, so a bad document or a saturated pool can still
+    become an error response; later documents wait up to `max_wait` seconds for
+    pool capacity instead of failing a half-sent archive. Past that the stream
+    ends with PoolSaturated, leaving the client a truncated download.
+    """
+    from src.execution import PoolSaturated
+
+    async def render_when_free(text: str) -> bytes:
+        deadline = time.monotonic() + max_wait
+        while True:
+            try:
+                return await run(render, text)
+            except PoolSaturated:
+                if time.monotonic() >= deadline:
+                    raise
+                await asyncio.sleep(retry_delay)
+
+    first = await run(render, documents[0].text) if documents else None
+
+    async def generate() -> AsyncIterator[bytes]:
+        streamer, used = ZipStreamer(), set()
+        pending: deque = deque()
+        try:
+            if documents:
+                yield streamer.add(entry_name(documents[0].name, used), first)
+            for document in documents[1:]:
+                pending.append((document, asyncio.ensure_future(render_when_free(document.text))))
+                if len(pending) >= window:
+                    done, task = pending.popleft()
+                    yield streamer.add(entry_name(done.name, used), await task)
+            while pending:
+                done, task = pending.popleft()
+                yield streamer.add(entry_name(done.name, used), await task)
+            yield streamer.close()
+        finally:
+            # Client went away mid-download: don't leave renders running
+            for _, task in pending:
+                task.cancel()
+
+    return generate()
+
+
+# --- Loading inputs ---------------------------------------------------------
+
+def load_documents(paths: List[str]) -> Iterator[ExportDocument]:
+    """Documents from input files, read lazily.
+
+    - agent.py JSON output: its tailored resume and cover letter
+    - .jsonl: one {"name": ..., "text": ...} object per line
+    - anything else (.md, .txt): the file itself
+    """
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if path.endswith(".jsonl"):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        item = json.loads(line)
+                        yield ExportDocument(item.get("name") or stem, item["text"])
+        elif path.endswith(".json"):
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            for field, suffix in (("tailored_resume", "resume"), ("cover_letter", "cover_letter")):
+                if result.get(field):
+                    yield ExportDocument(f"{stem}_{suffix}", result[field])
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                yield ExportDocument(stem, f.read())
+
+
+def export_zip(documents: Iterable[ExportDocument], output_path: str, workers: int = 2,
+               render: Callable[[str], bytes] = _render_docx, window: Optional[int] = None) -> int:
+    """Render documents in a process pool and write them to a ZIP file as they finish.
+
+    Returns the number of documents written.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor, open(output_path, "wb") as out:
+        rendered = render_ordered(executor, documents, render, window or max(EXPORT_WINDOW, workers * 2))
+        streamer, used = ZipStreamer(), set()
+        for document, data in rendered:
+            out.write(streamer.add(entry_name(document.name, used), data))
+        out.write(streamer.close())
+    return streamer.entries
+
+
+def run_cli(args: argparse.Namespace):
+    start = time.perf_counter()
+    try:
+        count = export_zip(load_documents(args.inputs), args.output, workers=args.workers)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count} documents to {args.output} in {elapsed:.1f}s", file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Export many Markdown documents as a ZIP of DOCX files")
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="agent.py JSON outputs (tailored resume and cover letter), .jsonl files of "
+        '{"name", "text"} objects, or Markdown/text files',
+    )
+    parser.add_argument("--output", required=True, help="Path of the ZIP file to write")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Rendering processes")
+    return parser
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    run_cli(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from src.profiling import run_in_profile
+
+# Chunks are bounded by both bullet count and total characters so one long
+# bullet list never turns into one giant prompt.
+MAX_CHUNK_BULLETS = 8
+MAX_CHUNK_CHARS = 1500
+MAX_WORKERS = 4
+MAX_RETRIES = 2
+CACHE_SIZE = 2048
+# Chunk calls from all requests share one pool, so this bounds the process-wide
+# fan-out on top of the callers' own threads (see execution.PoolConfig)
+CHUNK_WORKERS = int(os.getenv("RESUMEBOOST_CHUNK_WORKERS", 8))
+
+
+def jd_fingerprint(jd_text: str) -> str:
+    """Stable hash of a job description, insensitive to whitespace and case."""
+    normalized = " ".join(jd_text.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+class BulletCache:
+    """Thread-safe LRU cache of rewrites keyed by (bullet text, JD fingerprint)."""
+
+    def __init__(self, max_size: int = CACHE_SIZE):
+        self.max_size = max_size
+        self._data: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, bullet: str, fingerprint: str) -> Optional[str]:
+        key = (bullet.strip(), fingerprint)
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, bullet: str, fingerprint: str, rewritten: str):
+        key = (bullet.strip(), fingerprint)
+        with self._lock:
+            self._data[key] = rewritten
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_default_cache = BulletCache()
+
+_chunk_executor: Optional[ThreadPoolExecutor] = None
+_chunk_executor_lock = threading.Lock()
+
+
+def chunk_executor() -> ThreadPoolExecutor:
+    """Process-wide executor for concurrent chunk calls."""
+    global _chunk_executor
+    with _chunk_executor_lock:
+        if _chunk_executor is None:
+            _chunk_executor = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix="bullet-chunk")
+        return _chunk_executor
+
+
+@dataclass
+class RewriteStats:
+    cached: int = 0
+    model_calls: int = 0
+    # Chunk calls the cached bullets would have needed
+    calls_saved: int = 0
+    # Bullets returned unchanged because their chunk failed, not because they were rewritten
+    fallback_indices: List[int] = field(default_factory=list)
+
+
+def chunk_bullets(
+    bullets: List[str], max_bullets: int = MAX_CHUNK_BULLETS, max_chars: int = MAX_CHUNK_CHARS
+) -> List[List[int]]:
+    """Group bullet indices into chunks bounded by count and total length."""
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    current_chars = 0
+    for i, bullet in enumerate(bullets):
+        size = len(bullet)
+        if current and (len(current) >= max_bullets or current_chars + size > max_chars):
+            chunks.append(current)
+            current, current_chars = [], 0
+        current.append(i)
+        current_chars += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_chunk_prompt(bullets: List[str], jd_text: str) -> str:
+    return (
+        "Rewrite each resume bullet to align with the job description. "
+        "Preserve truthfulness, keep measurable outcomes, and keep each bullet concise.\n\n"
+        f"Job description:\n{jd_text}\n\n"
+        "Resume bullets (JSON array):\n"
+        f"{json.dumps(bullets, indent=2)}\n\n"
+        f"Respond with a JSON array of exactly {len(bullets)} rewritten bullets, "
+        "in the same order as the input."
+    )
+
+
+def parse_chunk_response(text: str, expected: int) -> Optional[List[str]]:
+    """Parse a model response into exactly `expected` strings, or None if it doesn't fit."""
+    text = (text or "").strip()
+    # Models often wrap JSON in markdown code fences
+    fenced = re.search(r"```(?:json)?\s*(\[.*?\])\s*```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    elif not text.startswith("["):
+        start, end = text.find("["), text.rfind("]")
+        if start != -1 and end > start:
+            text = text[start:end + 1]
+    try:
+        items = json.loads(text)
+    except Exception:
+        return None
+    if not isinstance(items, list) or len(items) != expected:
+        return None
+    if not all(isinstance(item, str) and item.strip() for item in items):
+        return None
+    return [item.strip() for item in items]
+
+
+def rewrite_chunk(model, bullets: List[str], jd_text: str, retries: int = MAX_RETRIES) -> Optional[List[str]]:
+    """Rewrite one chunk, retrying when the response can't be parsed.
+
+    Returns None if no attempt parsed. Model errors (auth, quota, network) are raised.
+    """
+    prompt = build_chunk_prompt(bullets, jd_text)
+    for _ in range(retries + 1):
+        response = model.generate_content(prompt)
+        parsed = parse_chunk_response(response.text, len(bullets))
+        if parsed is not None:
+            return parsed
+    return None
+
+
+def rewrite_bullets_parallel(
+    model,
+    bullets: List[str],
+    jd_text: str,
+    cache: Optional[BulletCache] = None,
+    max_workers: int = MAX_WORKERS,
+    max_bullets: int = MAX_CHUNK_BULLETS,
+    max_chars: int = MAX_CHUNK_CHARS,
+    retries: int = MAX_RETRIES,
+    fingerprint: Optional[str] = None,
+    stats: Optional[RewriteStats] = None,
+) -> List[str]:
+    """Rewrite bullets in concurrent chunks. Output is always index-aligned with input.
+
+    Cached bullets are returned without a model call. A chunk that fails keeps its
+    original bullets rather than failing the request, and its indices are listed in
+    `stats.fallback_indices`. If every chunk fails with a model error, the last
+    error is raised instead.
+    `fingerprint` overrides the JD cache key, e.g. to share rewrites between
+    near-duplicate JDs. If `stats` is given it is filled in for this call.
+    """
+    if not bullets:
+        return []
+    cache = _default_cache if cache is None else cache
+    fingerprint = fingerprint or jd_fingerprint(jd_text)
+
+    results: List[Optional[str]] = [None] * len(bullets)
+    pending: List[int] = []
+    for i, bullet in enumerate(bullets):
+        if not bullet.strip():
+            results[i] = bullet
+            continue
+        cached = cache.get(bullet, fingerprint)
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.append(i)
+
+    if stats is not None:
+        cached = [bullets[i] for i, r in enumerate(results) if r is not None and bullets[i].strip()]
+        stats.cached = len(cached)
+        stats.calls_saved = len(chunk_bullets(cached, max_bullets, max_chars))
+
+    if pending:
+        pending_texts = [bullets[i] for i in pending]
+        chunks = [
+            [pending[j] for j in chunk]
+            for chunk in chunk_bullets(pending_texts, max_bullets, max_chars)
+        ]
+
+        def run(chunk: List[int]) -> Tuple[List[int], Optional[List[str]], Optional[Exception]]:
+            try:
+                return chunk, rewrite_chunk(model, [bullets[i] for i in chunk], jd_text, retries), None
+            except Exception as e:
+                return chunk, None, e
+
+        if len(chunks) == 1 or max_workers <= 1:
+            outcomes = [run(chunk) for chunk in chunks]
+        else:
+            # The first chunk runs on this thread; the rest go to the shared pool, at most
+            # max_workers - 1 at a time for this call
+            executor, outcomes = chunk_executor(), [None] * len(chunks)
+            pooled_run = run_in_profile(run)
+            for start in range(1, len(chunks), max_workers - 1):
+                batch = range(start, min(start + max_workers - 1, len(chunks)))
+                futures = [executor.submit(pooled_run, chunks[k]) for k in batch]
+                if start == 1:
+                    outcomes[0] = run(chunks[0])
+                for k, future in zip(batch, futures):
+                    outcomes[k] = future.result()
+        if stats is not None:
+            stats.model_calls = len(chunks)
+
+        errors = [error for _, _, error in outcomes if error is not None]
+        if len(errors) == len(outcomes):
+            raise errors[-1]
+
+        for chunk, rewritten, _ in outcomes:
+            for pos, i in enumerate(chunk):
+                if rewritten is None:
+                    results[i] = bullets[i]
+                    if stats is not None:
+                        stats.fallback_indices.append(i)
+                else:
+                    results[i] = rewritten[pos]
+                    cache.put(bullets[i], fingerprint, rewritten[pos])
+
+    return results
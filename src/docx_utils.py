@@ -47,6 +47,12 @@ def markdown_to_docx(markdown_text: str) -> BytesIO:
     file_stream.seek(0)
     return file_stream
 
+def markdown_to_docx_bytes(markdown_text: str) -> bytes:
+    """
+    Same as markdown_to_docx but returns raw bytes, so it can run in a worker process.
+    """
+    return markdown_to_docx(markdown_text).getvalue()
+
 def add_formatted_text(paragraph, text):
     """
     Parses **bold** text and adds runs to the paragraph.
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from src.model_router import get_router
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturated(Exception):
+    """Raised when a pool already has as much work in flight as it is allowed to queue."""
+
+    def __init__(self, pool_name: str, retry_after: int):
+        super().__init__(f"{pool_name} pool is saturated")
+        self.pool_name = pool_name
+        self.retry_after = retry_after
+
+
+@dataclass
+class PoolConfig:
+    """Pool sizes. Upstream model concurrency is at most llm_workers plus
+    bullet_rewriter.CHUNK_WORKERS (RESUMEBOOST_CHUNK_WORKERS), since bullet
+    rewrites fan their extra chunks out to that shared pool."""
+    enabled: bool = False
+    llm_workers: int = 8
+    llm_queue: int = 16
+    cpu_workers: int = 2
+    cpu_queue: int = 8
+    retry_after: int = 5
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        """Read pool settings from RESUMEBOOST_* environment variables."""
+        def env_int(name: str, default: int) -> int:
+            return int(os.getenv(name, default))
+
+        return cls(
+            enabled=os.getenv("RESUMEBOOST_POOLS", "").lower() in ("1", "true", "yes"),
+            llm_workers=env_int("RESUMEBOOST_LLM_WORKERS", cls.llm_workers),
+            llm_queue=env_int("RESUMEBOOST_LLM_QUEUE", cls.llm_queue),
+            cpu_workers=env_int("RESUMEBOOST_CPU_WORKERS", cls.cpu_workers),
+            cpu_queue=env_int("RESUMEBOOST_CPU_QUEUE", cls.cpu_queue),
+            retry_after=env_int("RESUMEBOOST_RETRY_AFTER", cls.retry_after),
+        )
+
+
+class BoundedPool:
+    """An executor that rejects work instead of queueing without limit."""
+
+    def __init__(self, name: str, executor: Executor, workers: int, queue: int, retry_after: int):
+        self.name = name
+        self.executor = executor
+        self.capacity = workers + queue
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(self.capacity)
+
+    async def run(self, fn: Callable, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PoolSaturated(self.name, self.retry_after)
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# --- Worker warm-up -------------------------------------------------------
+
+def _warm_cpu_worker():
+    # Import parsers and load the default DOCX template before the first request
+    try:
+        import pypdf  # noqa: F401
+        from src.docx_utils import markdown_to_docx
+        markdown_to_docx("# warm-up")
+    except ImportError:
+        pass
+
+
+# --- Pool lifecycle -------------------------------------------------------
+
+_llm_pool: Optional[BoundedPool] = None
+_cpu_pool: Optional[BoundedPool] = None
+
+
+def start_pools(config: Optional[PoolConfig] = None):
+    """Create and warm the LLM thread pool and the CPU process pool, if enabled."""
+    global _llm_pool, _cpu_pool
+    config = config or PoolConfig.from_env()
+    if not config.enabled or _llm_pool is not None:
+        return
+
+    llm_executor = ThreadPoolExecutor(max_workers=config.llm_workers, thread_name_prefix="llm")
+    # Forking a process that already runs the event loop and LLM threads can deadlock,
+    # so CPU workers start from a clean forkserver (or spawn where unavailable)
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    cpu_executor = ProcessPoolExecutor(
+        max_workers=config.cpu_workers, initializer=_warm_cpu_worker, mp_context=multiprocessing.get_context(method)
+    )
+    _llm_pool = BoundedPool("llm", llm_executor, config.llm_workers, config.llm_queue, config.retry_after)
+    _cpu_pool = BoundedPool("cpu", cpu_executor, config.cpu_workers, config.cpu_queue, config.retry_after)
+
+    # The router is shared by every LLM thread, so building it once here is the warm-up.
+    # Requests still start if it fails (e.g. no API key) and report the error themselves.
+    try:
+        get_router()
+    except Exception:
+        logger.exception("Model router failed to initialise; requests will retry it")
+    # Process workers start lazily; submit no-ops so they import and warm up now
+    for _ in range(config.cpu_workers):
+        cpu_executor.submit(int)
+
+
+def shutdown_pools():
+    global _llm_pool, _cpu_pool
+    for pool in (_llm_pool, _cpu_pool):
+        if pool is not None:
+            pool.shutdown()
+    _llm_pool = _cpu_pool = None
+
+
+async def _run_inline(fn: Callable, *args):
+    # Without pools, fall back to the event loop's default thread pool
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+async def run_llm(fn: Callable, *args):
+    """Run a blocking model call on the LLM pool."""
+    if _llm_pool is None:
+        return await _run_inline(fn, *args)
+    return await _llm_pool.run(fn, *args)
+
+
+async def run_cpu(fn: Callable, *args):
+    """Run CPU-bound work (PDF parsing, DOCX rendering) on the process pool.
+
+    `fn` must be a module-level function so it can be pickled.
+    """
+    if _cpu_pool is None:
+        return await _run_inline(fn, *args)
+    return await _cpu_pool.run(fn, *args)
@@ -0,0 +1,79 @@
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from typing import Optional
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Local stand-in for genai.GenerativeModel with configurable latency and errors.
+
+    Latency is log-normal around `latency_ms` (spread set by `sigma`), plus
+    `ms_per_kchar` for every 1000 prompt characters. Responses have the shape
+    each prompt in src/agent.py asks for, so the pipeline runs end to end.
+    """
+
+    def __init__(self, model_name: str = "fake", latency_ms: float = 800.0, sigma: float = 0.4,
+                 ms_per_kchar: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.model_name = model_name
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.ms_per_kchar = ms_per_kchar
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    @classmethod
+    def from_env(cls, model_name: str = "fake") -> "FakeGeminiModel":
+        """Build from FAKE_MODEL_* variables. Options after a colon in the name override
+        them per model, e.g. "fake-fast:latency_ms=200,error_rate=0.05"."""
+        seed = os.getenv("FAKE_MODEL_SEED")
+        options = {
+            "latency_ms": float(os.getenv("FAKE_MODEL_LATENCY_MS", 800)),
+            "sigma": float(os.getenv("FAKE_MODEL_SIGMA", 0.4)),
+            "ms_per_kchar": float(os.getenv("FAKE_MODEL_MS_PER_KCHAR", 0)),
+            "error_rate": float(os.getenv("FAKE_MODEL_ERROR_RATE", 0)),
+            "seed": int(seed) if seed else None,
+        }
+        _, _, overrides = model_name.partition(":")
+        for item in filter(None, overrides.split(",")):
+            key, _, value = item.partition("=")
+            if key not in options:
+                raise ValueError(f"Unknown fake model option: {key}")
+            options[key] = int(value) if key == "seed" else float(value)
+        return cls(model_name=model_name, **options)
+
+    def _draw(self, prompt: str):
+        with self._lock:
+            self.calls += 1
+            latency = self._random.lognormvariate(math.log(max(self.latency_ms, 0.001)), self.sigma)
+            failed = self._random.random() < self.error_rate
+        return (latency + self.ms_per_kchar * len(prompt) / 1000) / 1000, failed
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        delay, failed = self._draw(prompt)
+        time.sleep(delay)
+        if failed:
+            raise RuntimeError(f"{self.model_name}: simulated upstream error")
+        return FakeResponse(self._respond(prompt))
+
+    def _respond(self, prompt: str) -> str:
+        exact = re.search(r"JSON array of exactly (\d+)", prompt)
+        if exact:
+            return json.dumps([f"Rewritten bullet {i + 1}" for i in range(int(exact.group(1)))])
+        if "technical skills" in prompt.lower():
+            return json.dumps(["python", "java", "aws", "docker", "kubernetes", "react"])
+        if "JSON array of strings" in prompt:
+            return json.dumps(["Add more keywords from the job description to your resume"])
+        if "Original Resume:" in prompt:
+            return prompt.split("Original Resume:", 1)[1].rsplit("Output the full", 1)[0].strip()
+        return "Dear Hiring Manager,\n\n" + "I am excited to apply for this role. " * 20
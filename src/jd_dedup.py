@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from src.bullet_rewriter import jd_fingerprint
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows: candidates start showing up around 0.7 Jaccard
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+MAX_ENTRIES = 10000
+
+# Signatures from another scheme can't be compared; persisted entries carry this
+SIGNATURE_VERSION = 2
+# Each permutation XORs the shingles' 64-bit hashes with a fixed random mask
+_rng = random.Random(1)
+_MASKS = [_rng.getrandbits(64) for _ in range(NUM_PERM)]
+
+TOKEN_REGEX = re.compile(r"[a-z0-9+#]+")
+
+
+def normalize_jd(jd_text: str) -> List[str]:
+    """Lowercased word tokens with punctuation and layout removed."""
+    return TOKEN_REGEX.findall(jd_text.lower())
+
+
+def shingles(tokens: List[str], size: int = SHINGLE_SIZE) -> Set[str]:
+    if len(tokens) <= size:
+        return {" ".join(tokens)}
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(shingle_set: Set[str]) -> List[int]:
+    # Shingles are hashed once; each permutation is then a single min() over a C-level map
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+        for s in shingle_set
+    ]
+    return [min(map(mask.__xor__, hashes)) for mask in _MASKS]
+
+
+def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class JDKey:
+    """A JD's fingerprint, plus its MinHash signature computed on first use.
+
+    One key serves both lookup() and add(), so the signature is computed at
+    most once per request, and not at all for exact repeats.
+    """
+
+    def __init__(self, jd_text: str):
+        self.fingerprint = jd_fingerprint(jd_text)
+        self._jd_text = jd_text
+        self._signature: Optional[List[int]] = None
+
+    @property
+    def signature(self) -> List[int]:
+        if self._signature is None:
+            self._signature = minhash(shingles(normalize_jd(self._jd_text)))
+        return self._signature
+
+
+@dataclass
+class JDEntry:
+    """Reusable JD-side artifacts for one job description."""
+    # Also the key bullet rewrites are cached under (see bullet_rewriter)
+    fingerprint: str
+    signature: List[int]
+    skills: List[str]
+    # Lines written before versioning used scheme 1
+    version: int = 1
+
+
+@dataclass
+class JDMatch:
+    entry: JDEntry
+    similarity: float
+    exact: bool
+
+
+@dataclass
+class DedupStats:
+    lookups: int = 0
+    exact_hits: int = 0
+    near_duplicate_hits: int = 0
+    upstream_calls_saved: int = 0
+    saved_by_stage: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class JDIndex:
+    """MinHash/LSH index of processed job descriptions.
+
+    A JD whose estimated Jaccard similarity (word 3-shingles) to an indexed one
+    is at least `threshold` reuses that entry's skills and bullet-cache
+    fingerprint. With `path` set, entries are appended to a JSON-lines file and
+    reloaded on start. Only signatures, skills and fingerprints are stored,
+    never the JD text. A threshold of 0 or less disables the index: lookups
+    never match and nothing is added.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, path: Optional[str] = None,
+                 max_entries: int = MAX_ENTRIES):
+        self.threshold = threshold
+        self.enabled = threshold > 0
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, JDEntry]" = OrderedDict()
+        self.buckets: Dict[tuple, Set[str]] = defaultdict(set)
+        self.stats = DedupStats()
+        self._lock = threading.Lock()
+        if self.enabled and path and os.path.exists(path):
+            self._load(path)
+
+    @staticmethod
+    def _bands(signature: List[int]):
+        rows = NUM_PERM // BANDS
+        for band in range(BANDS):
+            yield (band, tuple(signature[band * rows:(band + 1) * rows]))
+
+    def key(self, jd_text: str) -> Optional[JDKey]:
+        """Key for lookup() and add(), or None when the index is disabled."""
+        return JDKey(jd_text) if self.enabled else None
+
+    def lookup(self, key: Optional[JDKey]) -> Optional[JDMatch]:
+        """Closest indexed JD at or above the threshold, or None."""
+        if key is None:
+            return None
+        with self._lock:
+            self.stats.lookups += 1
+            exact = self.entries.get(key.fingerprint)
+            if exact is not None:
+                self.stats.exact_hits += 1
+                return JDMatch(exact, 1.0, True)
+        # Outside the lock: the signature is the expensive part
+        signature = key.signature
+        with self._lock:
+            candidates = set()
+            for key in self._bands(signature):
+                candidates |= self.buckets.get(key, set())
+            best = max(
+                ((similarity(signature, self.entries[c].signature), c) for c in candidates),
+                default=(0.0, None),
+            )
+            if best[1] is None or best[0] < self.threshold:
+                return None
+            self.stats.near_duplicate_hits += 1
+            return JDMatch(self.entries[best[1]], best[0], False)
+
+    def add(self, key: Optional[JDKey], skills: Set[str]) -> Optional[JDEntry]:
+        if key is None:
+            return None
+        entry = JDEntry(
+            fingerprint=key.fingerprint, signature=key.signature, skills=sorted(skills),
+            version=SIGNATURE_VERSION,
+        )
+        with self._lock:
+            # A concurrent request may have added the same JD first; keep one line per entry
+            if self._insert(entry) and self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry.__dict__) + "\n")
+        return entry
+
+    def record_saved(self, stage_name: str, calls: int):
+        if calls <= 0:
+            return
+        with self._lock:
+            self.stats.upstream_calls_saved += calls
+            self.stats.saved_by_stage[stage_name] += calls
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "lookups": self.stats.lookups,
+                "exact_hits": self.stats.exact_hits,
+                "near_duplicate_hits": self.stats.near_duplicate_hits,
+                "upstream_calls_saved": self.stats.upstream_calls_saved,
+                "saved_by_stage": dict(self.stats.saved_by_stage),
+            }
+
+    def _insert(self, entry: JDEntry) -> bool:
+        """Index `entry`. Returns False if an entry with the same fingerprint was already there."""
+        if entry.fingerprint in self.entries:
+            self.entries.move_to_end(entry.fingerprint)
+            return False
+        self.entries[entry.fingerprint] = entry
+        for key in self._bands(entry.signature):
+            self.buckets[key].add(entry.fingerprint)
+        while len(self.entries) > self.max_entries:
+            _, evicted = self.entries.popitem(last=False)
+            for key in self._bands(evicted.signature):
+                self.buckets[key].discard(evicted.fingerprint)
+                if not self.buckets[key]:
+                    del self.buckets[key]
+        return True
+
+    def _load(self, path: str):
+        lines = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    lines += 1
+                    entry = JDEntry(**json.loads(line))
+                    # Signatures from an older scheme would never match; drop them
+                    if entry.version == SIGNATURE_VERSION:
+                        self._insert(entry)
+        # Evicted, duplicate and outdated lines only grow the file; rewrite it with the live entries
+        if lines > len(self.entries):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry.__dict__) + "\n")
+            os.replace(tmp_path, path)
+
+
+_index: Optional[JDIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_jd_index() -> JDIndex:
+    """Process-wide index, persisted to RESUMEBOOST_JD_INDEX when set.
+
+    RESUMEBOOST_JD_SIMILARITY=0 turns near-duplicate reuse off.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = JDIndex(
+                threshold=float(os.getenv("RESUMEBOOST_JD_SIMILARITY", DEFAULT_THRESHOLD)),
+                path=os.getenv("RESUMEBOOST_JD_INDEX"),
+            )
+        return _index
@@ -0,0 +1,228 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from src.agent import ensure_gemini
+
+# Generation stages in src/agent.py and the tier each uses by default
+DEFAULT_STAGE_TIERS = {
+    "skills": "fast",
+    "ats_recommendations": "fast",
+    "rewrite_bullets": "balanced",
+    "cover_letter": "balanced",
+    "tailored_resume": "quality",
+}
+
+# Downgrade direction when every model in a tier is over budget
+TIER_ORDER = ["quality", "balanced", "fast"]
+
+DEFAULT_P95_BUDGET_MS = {"fast": 4000.0, "balanced": 10000.0, "quality": 25000.0}
+
+
+@dataclass
+class RoutingConfig:
+    """Which models serve which tier, which tier serves which stage, and the health budgets.
+
+    Loaded from RESUMEBOOST_ROUTING (inline JSON or a path to a JSON file) with keys
+    matching the fields below. Without it, every stage uses the single model that
+    ensure_gemini() would pick, as before.
+    """
+    tiers: Dict[str, List[str]]
+    stages: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_STAGE_TIERS))
+    p95_budget_ms: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_P95_BUDGET_MS))
+    max_error_rate: float = 0.25
+    window: int = 50
+    window_s: float = 300.0
+    min_samples: int = 5
+    cooldown_s: float = 30.0
+
+    @classmethod
+    def from_env(cls, env: str = "RESUMEBOOST_ROUTING") -> "RoutingConfig":
+        raw = os.getenv(env)
+        if not raw:
+            model = os.getenv("GEMINI_MODEL") or "gemini-flash-latest"
+            return cls(tiers={tier: [model] for tier in TIER_ORDER})
+        if os.path.exists(raw):
+            with open(raw, "r", encoding="utf-8") as f:
+                raw = f.read()
+        data = json.loads(raw)
+        config = cls(tiers=data.pop("tiers"))
+        for key, value in data.items():
+            if not hasattr(config, key):
+                raise ValueError(f"Unknown routing option: {key}")
+            current = getattr(config, key)
+            setattr(config, key, {**current, **value} if isinstance(current, dict) else value)
+        missing = set(config.stages.values()) - set(config.tiers)
+        if missing:
+            raise ValueError(f"Stages reference undefined tiers: {', '.join(sorted(missing))}")
+        return config
+
+
+class ModelHealth:
+    """Rolling latency and error window for one model, with a half-open probe after cooldown."""
+
+    def __init__(self, window: int, window_s: float):
+        self.window_s = window_s
+        self.samples: deque = deque(maxlen=window)
+        self.last_probe = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float, ok: bool, probe: bool = False):
+        with self._lock:
+            if probe and ok:
+                # A successful probe closes the breaker: start a fresh window
+                self.samples.clear()
+            self.samples.append((time.monotonic(), latency_ms, ok))
+
+    def _recent(self) -> list:
+        cutoff = time.monotonic() - self.window_s
+        return [s for s in self.samples if s[0] >= cutoff]
+
+    def stats(self) -> dict:
+        with self._lock:
+            recent = self._recent()
+        latencies = sorted(s[1] for s in recent if s[2])
+        return {
+            "samples": len(recent),
+            "p50_ms": latencies[len(latencies) // 2] if latencies else None,
+            "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None,
+            "error_rate": (sum(1 for s in recent if not s[2]) / len(recent)) if recent else 0.0,
+        }
+
+    def healthy(self, budget_ms: float, max_error_rate: float, min_samples: int) -> bool:
+        stats = self.stats()
+        if stats["samples"] < min_samples:
+            return True
+        if stats["error_rate"] > max_error_rate:
+            return False
+        return stats["p95_ms"] is None or stats["p95_ms"] <= budget_ms
+
+    def probe_due(self, cooldown_s: float) -> bool:
+        return time.monotonic() - self.last_probe >= cooldown_s
+
+    def try_probe(self, cooldown_s: float) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if now - self.last_probe < cooldown_s:
+                return False
+            self.last_probe = now
+            return True
+
+
+class StageModel:
+    """Model-like handle that routes generate_content for one pipeline stage."""
+
+    def __init__(self, router: "ModelRouter", stage: str):
+        self.router = router
+        self.stage = stage
+
+    def generate_content(self, prompt: str):
+        return self.router.generate(self.stage, prompt)
+
+    def for_stage(self, stage: str) -> "StageModel":
+        return self.router.for_stage(stage)
+
+
+class ModelRouter:
+    """Routes each generation stage to a model tier, failing over between models and
+    downgrading to cheaper tiers when a model's rolling p95 or error rate is over budget."""
+
+    def __init__(self, config: RoutingConfig, factory: Callable[[str], object] = ensure_gemini):
+        self.config = config
+        names = {name for models in config.tiers.values() for name in models}
+        # Created eagerly so configuration errors (e.g. a missing API key) surface up front
+        self.clients = {name: factory(name) for name in sorted(names)}
+        # Health is per (model, tier) so each tier's budget is judged on its own traffic:
+        # slow long-output calls in the quality tier don't downgrade a model's cheap stages
+        self.health = {
+            (name, tier): ModelHealth(config.window, config.window_s)
+            for tier, models in config.tiers.items() for name in models
+        }
+
+    def for_stage(self, stage: str) -> StageModel:
+        return StageModel(self, stage)
+
+    def generate_content(self, prompt: str):
+        return self.generate(None, prompt)
+
+    def tier_for(self, stage: Optional[str]) -> str:
+        tier = self.config.stages.get(stage) if stage else None
+        return tier if tier in self.config.tiers else next(iter(self.config.tiers))
+
+    def candidates(self, stage: Optional[str], probe: bool = True) -> List[tuple]:
+        """(model, tier, is_probe) in preference order: healthy models in the stage's tier,
+        then in each cheaper tier, then over-budget models as a last resort.
+
+        An over-budget model whose cooldown has passed is offered as a probe; the probe
+        slot is only taken by generate() if that model is actually called."""
+        tier = self.tier_for(stage)
+        tiers = [tier]
+        if tier in TIER_ORDER:
+            tiers += [t for t in TIER_ORDER[TIER_ORDER.index(tier) + 1:] if t in self.config.tiers]
+
+        preferred, fallback, seen = [], [], set()
+        for t in tiers:
+            budget = self.config.p95_budget_ms.get(t, float("inf"))
+            for name in self.config.tiers[t]:
+                if name in seen:
+                    continue
+                seen.add(name)
+                health = self.health[(name, t)]
+                if health.healthy(budget, self.config.max_error_rate, self.config.min_samples):
+                    preferred.append((name, t, False))
+                elif probe and health.probe_due(self.config.cooldown_s):
+                    preferred.append((name, t, True))
+                else:
+                    fallback.append((name, t, False))
+        return preferred + fallback
+
+    def generate(self, stage: Optional[str], prompt: str):
+        last_error: Optional[Exception] = None
+        queue = deque(self.candidates(stage))
+        while queue:
+            name, tier, probe = queue.popleft()
+            health = self.health[(name, tier)]
+            if probe and not health.try_probe(self.config.cooldown_s):
+                # Another request took the probe; keep this model as a last resort
+                queue.append((name, tier, False))
+                continue
+            start = time.perf_counter()
+            try:
+                response = self.clients[name].generate_content(prompt)
+            except Exception as e:
+                health.record((time.perf_counter() - start) * 1000, False, probe)
+                last_error = e
+                continue
+            health.record((time.perf_counter() - start) * 1000, True, probe)
+            return response
+        raise last_error or RuntimeError(f"No model available for stage {stage}")
+
+    def snapshot(self) -> dict:
+        """Rolling stats per model and tier, plus the model each stage would use right now."""
+        models = defaultdict(dict)
+        for (name, tier), health in self.health.items():
+            models[name][tier] = health.stats()
+        return {
+            "models": dict(models),
+            "stages": {
+                stage: (self.candidates(stage, probe=False) or [(None,)])[0][0]
+                for stage in self.config.stages
+            },
+        }
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """Process-wide router built from the environment, so health stats are shared."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(RoutingConfig.from_env())
+        return _router
@@ -0,0 +1,244 @@
+import re
+from typing import Iterable, List, Optional, Set
+
+from src.agent import ACTION_VERBS, AnalysisResult, ResumeText, rule_based_recommendations, score_ats
+
+# Technical skills recognised by the local extractor. Multi-word skills are
+# matched as consecutive words; "a/b" lists are split and matched per part.
+TECH_SKILLS = frozenset({
+    # Languages
+    "python", "java", "javascript", "typescript", "go", "golang", "rust", "c", "c++", "c#", "ruby",
+    "php", "scala", "kotlin", "swift", "objective-c", "r", "matlab", "perl", "bash", "shell",
+    "powershell", "sql", "html", "css", "sass", "dart", "elixir", "haskell", "lua", "groovy",
+    # Frameworks and libraries
+    "react", "angular", "vue", "svelte", "next.js", "node", "node.js", "express", "django", "flask",
+    "fastapi", "spring", "spring boot", "rails", "laravel", ".net", "asp.net", "jquery", "redux",
+    "graphql", "rest", "grpc", "tailwind", "bootstrap", "pandas", "numpy", "scipy", "scikit-learn",
+    "tensorflow", "pytorch", "keras", "spark", "hadoop", "kafka", "airflow", "dbt", "celery",
+    "react native", "flutter", "hibernate", "junit", "pytest", "jest", "cypress", "selenium",
+    "cucumber", "playwright", "mocha",
+    # Data stores
+    "mysql", "postgresql", "postgres", "mongodb", "redis", "cassandra", "dynamodb", "elasticsearch",
+    "oracle", "sqlite", "snowflake", "bigquery", "redshift", "nosql", "neo4j",
+    # Cloud and infrastructure
+    "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "terraform", "ansible", "jenkins",
+    "ci/cd", "github actions", "gitlab", "git", "linux", "nginx", "helm", "openshift", "serverless",
+    "lambda", "ec2", "s3", "cloudformation", "prometheus", "grafana", "datadog", "splunk",
+    "maven", "gradle", "artifactory", "microservices",
+    # Practices and domains
+    "machine learning", "deep learning", "nlp", "computer vision", "data science", "etl",
+    "agile", "scrum", "tdd", "devops", "mlops", "llm", "figma", "jira", "tableau", "power bi",
+    "excel",
+})
+
+# Common spellings folded onto one canonical skill
+SKILL_ALIASES = {
+    "golang": "go",
+    "postgres": "postgresql",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "js": "javascript",
+    "ts": "typescript",
+    "k8s": "kubernetes",
+    "google cloud": "gcp",
+    "reactjs": "react",
+    "react.js": "react",
+    "vue.js": "vue",
+    "angularjs": "angular",
+}
+
+# Names that are also ordinary words only count next to a list delimiter
+# ("Skills: Go, C", "AWS (EC2, Lambda)", "Java/Spring"), not inside a sentence
+_AMBIGUOUS = frozenset({"c", "r", "go", "rest", "spring", "lambda", "shell", "excel", "express"})
+_LIST_BEFORE = ",;:(/"
+_LIST_AFTER = ",;:)/"
+_NAME_CHARS = "+#.-"
+
+# Punctuation turned into spaces before splitting ("(EC2," -> "ec2"); "/" is kept for "ci/cd"
+TOKEN_PUNCTUATION = "()[]{}<>,;:!?\"'*•|"
+# Single letters occur inside most words, so find them with a regex rather than str.find
+_SINGLE_LETTER_REGEX = re.compile(r"(?<![\w+#.\-])[a-z](?![\w+#])")
+_KNOWN_WORDS = (
+    frozenset(skill for skill in TECH_SKILLS if " " not in skill) - _AMBIGUOUS
+) | frozenset(alias for alias in SKILL_ALIASES if " " not in alias)
+_MULTI_WORD = [
+    (skill, re.compile(rf"\b{re.escape(skill)}\b"))
+    for skill in sorted(TECH_SKILLS | set(SKILL_ALIASES)) if " " in skill
+]
+
+# Weak openers replaced in draft bullets
+WEAK_OPENERS = [
+    (re.compile(r"^responsible for\s+", re.I), "Owned "),
+    (re.compile(r"^worked on\s+", re.I), "Contributed to "),
+    (re.compile(r"^helped( to)?\s+", re.I), "Supported efforts to "),
+    (re.compile(r"^assisted (with|in)\s+", re.I), "Supported "),
+    (re.compile(r"^involved in\s+", re.I), "Contributed to "),
+]
+
+BULLET_MARKER_REGEX = re.compile(r"^[\s•\-\*•◦‣]+")
+NUMBER_REGEX = re.compile(r"\d")
+
+OFFLINE_SKILL_FIELDS = ["jd_skills", "resume_skills", "missing_skills", "overlap_skills"]
+
+
+def _canonical(skill: str) -> str:
+    return SKILL_ALIASES.get(skill, skill)
+
+
+def extract_skills_local(text: str) -> Set[str]:
+    """Dictionary-based technical skill extraction. Deterministic and model-free."""
+    return _extract_skills_lowered(text.lower())
+
+
+def _extract_skills_lowered(text: str) -> Set[str]:
+    # Set operations over distinct words, with the splitting done in C, keep this
+    # fast enough for bulk scoring
+    spaced = text
+    for char in TOKEN_PUNCTUATION:
+        spaced = spaced.replace(char, " ")
+    words = set(spaced.split())
+    words.update([w.rstrip(".-") for w in words if w[-1] in ".-"])
+    for word in [w for w in words if "/" in w and w not in TECH_SKILLS]:
+        words.update(part.strip(".-") for part in word.split("/"))
+    found = {_canonical(word) for word in words & _KNOWN_WORDS}
+    found.update(_canonical(skill) for skill, pattern in _MULTI_WORD if skill in text and pattern.search(text))
+    found.update(word for word in words & _AMBIGUOUS if _is_listed(text, word))
+    return found
+
+
+def _occurrences(text: str, word: str):
+    if len(word) == 1:
+        for match in _SINGLE_LETTER_REGEX.finditer(text):
+            if match.group(0) == word:
+                yield match.start()
+        return
+    start = text.find(word)
+    while start != -1:
+        end = start + len(word)
+        if (start == 0 or not (text[start - 1].isalnum() or text[start - 1] in _NAME_CHARS)) and (
+            end == len(text) or not (text[end].isalnum() or text[end] in "+#")
+        ):
+            yield start
+        start = text.find(word, end)
+
+
+def _is_listed(text: str, word: str) -> bool:
+    """Whether `word` appears as a list item ("Go, C", "(Lambda)", "Java/Spring") anywhere in text."""
+    for start in _occurrences(text, word):
+        before = start - 1
+        while before >= 0 and text[before] == " ":
+            before -= 1
+        after = text[start + len(word):start + len(word) + 2].lstrip(" .")
+        if (before >= 0 and text[before] in _LIST_BEFORE) or (after and after[0] in _LIST_AFTER):
+            return True
+    return False
+
+
+def draft_bullets(bullets: List[str]) -> List[str]:
+    """Template rewrite of bullets: strip markers, replace weak openers, tidy casing.
+
+    Never adds facts, so the draft stays truthful. Index-aligned with the input.
+    """
+    drafts = []
+    for bullet in bullets:
+        text = " ".join(BULLET_MARKER_REGEX.sub("", bullet).split())
+        if not text:
+            drafts.append(bullet)
+            continue
+        for pattern, replacement in WEAK_OPENERS:
+            text, replaced = pattern.subn(replacement, text, count=1)
+            if replaced:
+                break
+        drafts.append(text[0].upper() + text[1:].rstrip("."))
+    return drafts
+
+
+def _strongest_bullet(bullets: List[str]) -> Optional[str]:
+    # Only bullets that read as "I <past-tense verb> ..." fit the template sentence;
+    # prefer ones with numbers, then ones that open with a listed action verb
+    scored = []
+    for bullet in bullets:
+        verb = bullet.split(" ", 1)[0].lower()
+        if verb in ACTION_VERBS or verb.endswith("ed"):
+            scored.append((bool(NUMBER_REGEX.search(bullet)), verb in ACTION_VERBS, -len(bullet), bullet))
+    return max(scored)[3] if scored else None
+
+
+def _candidate_name(resume_text: str) -> Optional[str]:
+    for line in resume_text.split("\n"):
+        line = line.strip()
+        if line:
+            words = line.split()
+            return line if len(words) <= 4 and all(w[:1].isupper() for w in words) else None
+    return None
+
+
+def draft_cover_letter(resume_text: str, overlap_skills: Iterable[str], bullets: List[str]) -> str:
+    """Template cover letter built only from skills and achievements found in the resume."""
+    overlap = list(overlap_skills)[:5]
+    paragraphs = ["Dear Hiring Manager,", "I am writing to apply for this role."]
+    if overlap:
+        skills = ", ".join(overlap[:-1]) + (f" and {overlap[-1]}" if len(overlap) > 1 else overlap[0])
+        paragraphs[1] += f" My experience with {skills} matches what your team is looking for."
+    highlight = _strongest_bullet(bullets)
+    if highlight:
+        highlight = highlight[0].lower() + highlight[1:]
+        paragraphs.append(f"In a recent role I {highlight}.")
+    paragraphs.append(
+        "I would welcome the chance to discuss how I can contribute. Thank you for your time and consideration."
+    )
+    name = _candidate_name(resume_text)
+    paragraphs.append(f"Sincerely,\n{name}" if name else "Sincerely,")
+    return "\n\n".join(paragraphs)
+
+
+class OfflineScorer:
+    """Scores many resumes against one job description without any model calls.
+
+    JD skills are extracted once, so bulk screening only pays for resume-side work.
+    """
+
+    def __init__(self, jd_text: str, drafts: bool = False):
+        self.jd_text = jd_text
+        self.jd_skills = extract_skills_local(jd_text)
+        self.drafts = drafts
+
+    def analyze(self, resume_text: str, bullets: Optional[List[str]] = None) -> AnalysisResult:
+        # Lowered once for both skill extraction and the ATS checks
+        resume = ResumeText(resume_text)
+        resume_skills = _extract_skills_lowered(resume.lower)
+        missing = sorted(self.jd_skills - resume_skills)
+        overlap = sorted(self.jd_skills & resume_skills)
+        score_data = score_ats(resume, self.jd_skills, resume_skills)
+        offline_fields = OFFLINE_SKILL_FIELDS + ["ats_recommendations"]
+
+        rewritten, cover_letter = list(bullets or []), ""
+        if self.drafts:
+            if bullets is None:
+                from src.resume_parser import parse_resume
+                bullets = parse_resume(resume_text).experience_bullets
+            rewritten = draft_bullets(bullets)
+            cover_letter = draft_cover_letter(resume_text, overlap, rewritten)
+            offline_fields += ["rewritten_bullets", "cover_letter"]
+
+        return AnalysisResult(
+            jd_skills=sorted(self.jd_skills),
+            resume_skills=sorted(resume_skills),
+            missing_skills=missing,
+            overlap_skills=overlap,
+            rewritten_bullets=rewritten,
+            cover_letter=cover_letter,
+            # Tailoring the whole resume needs a model; offline mode leaves it empty
+            tailored_resume="",
+            ats_score=score_data["total_score"],
+            ats_breakdown=score_data["breakdown"],
+            ats_recommendations=rule_based_recommendations(score_data, missing),
+            offline_fields=offline_fields,
+        )
+
+
+def analyze_offline(resume_text: str, jd_text: str, bullets: Optional[List[str]] = None,
+                    drafts: bool = False) -> AnalysisResult:
+    """analyze() without the model: local skills, rule-based recommendations and,
+    with `drafts`, template bullet and cover-letter drafts."""
+    return OfflineScorer(jd_text, drafts).analyze(resume_text, bullets)
@@ -0,0 +1,12 @@
+import io
+
+
+def extract_pdf_text(content: bytes) -> str:
+    """Extract text from every page of a PDF held in memory."""
+    import pypdf
+
+    pdf_reader = pypdf.PdfReader(io.BytesIO(content))
+    text = ""
+    for page in pdf_reader.pages:
+        text += (page.extract_text() or "") + "\n"
+    return text
@@ -0,0 +1,190 @@
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Set
+
+TOP_ALLOCATIONS = 20
+SAMPLE_INTERVAL = 0.005
+
+_active: ContextVar[Optional["RunProfiler"]] = ContextVar("resumeboost_profiler", default=None)
+
+# cProfile and tracemalloc are process-wide, so only one run is profiled at a time
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def stage(name: str):
+    """Record a wall-time span for a pipeline stage when a profiler is active."""
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.spans.append({
+            "stage": name,
+            "start_ms": round((start - profiler.started) * 1000, 3),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+        })
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def run_in_profile(fn: Callable) -> Callable:
+    """Wrap `fn` for another thread so its work belongs to the current profiled run.
+
+    While the wrapper runs, stages record into the run and the sampler includes that
+    thread. Without an active profile `fn` is returned unchanged.
+    """
+    profiler = _active.get()
+    if profiler is None:
+        return fn
+
+    def run(*args, **kwargs):
+        thread_id = threading.get_ident()
+        token = _active.set(profiler)
+        profiler._sampler.threads.add(thread_id)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler._sampler.threads.discard(thread_id)
+            _active.reset(token)
+
+    return run
+
+
+class _StackSampler(threading.Thread):
+    """Samples the profiled thread, and threads doing work for the run (see
+    run_in_profile), into collapsed stacks ("root;caller;leaf count") for
+    flamegraph tools. Other requests' threads are never sampled."""
+
+    def __init__(self, target_thread: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.threads: Set[int] = {target_thread}
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in self.threads:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class RunProfiler:
+    """Profile a single run: cProfile, stage spans, sampled stacks and tracemalloc top-N.
+
+    On exit writes <prefix>.pstats, <prefix>.collapsed and <prefix>.json. If another
+    run is already being profiled, this one runs unprofiled and `active` is False.
+
+    cProfile and the sampled stacks cover only this run's threads, but tracemalloc
+    traces the whole process: in a server, the memory figures and top allocations
+    include other requests running at the same time, and tracing slows all of them
+    down while the profile is active.
+    """
+
+    def __init__(self, prefix: str, top_n: int = TOP_ALLOCATIONS, interval: float = SAMPLE_INTERVAL):
+        self.prefix = prefix
+        self.top_n = top_n
+        self.interval = interval
+        self.spans: List[Dict] = []
+        self.files: List[str] = []
+        self.active = False
+        self.started = 0.0
+
+    def __enter__(self) -> "RunProfiler":
+        if not _profile_lock.acquire(blocking=False):
+            return self
+        self.active = True
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._sampler = _StackSampler(threading.get_ident(), self.interval)
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._token = _active.set(self)
+        self.started = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.active:
+            return False
+        try:
+            self._profile.disable()
+            wall_ms = (time.perf_counter() - self.started) * 1000
+            _active.reset(self._token)
+            self._sampler.stop()
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+            self._write(wall_ms, snapshot, current, peak)
+        finally:
+            _profile_lock.release()
+        return False
+
+    def _write(self, wall_ms: float, snapshot, current: int, peak: int):
+        os.makedirs(os.path.dirname(os.path.abspath(self.prefix)), exist_ok=True)
+
+        pstats_path = f"{self.prefix}.pstats"
+        self._profile.dump_stats(pstats_path)
+
+        collapsed_path = f"{self.prefix}.collapsed"
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in self._sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        top_allocations = [
+            {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:self.top_n]
+        ]
+        stats = pstats.Stats(self._profile)
+        top_functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top_n]
+
+        summary_path = f"{self.prefix}.json"
+        summary = {
+            "wall_ms": round(wall_ms, 3),
+            "spans": self.spans,
+            "cpu_top_cumulative": [
+                {
+                    "function": f"{name} ({os.path.basename(filename)}:{line})",
+                    "calls": calls,
+                    "cumulative_ms": round(cumtime * 1000, 3),
+                }
+                for (filename, line, name), (_, calls, _, cumtime, _) in top_functions
+            ],
+            "memory": {"current_bytes": current, "peak_bytes": peak, "top_allocations": top_allocations},
+            "files": [pstats_path, collapsed_path, summary_path],
+        }
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        self.files = summary["files"]
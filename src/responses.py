@@ -0,0 +1,133 @@
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Bodies smaller than this aren't worth the compression CPU or header overhead
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Bump when the response shape changes so clients don't keep stale bodies
+RESPONSE_VERSION = "1"
+
+
+def dumps(data: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[list]:
+    """Split a ?fields=a,b query value into a sorted list, or None for all fields."""
+    if not fields:
+        return None
+    return sorted({f.strip() for f in fields.split(",") if f.strip()}) or None
+
+
+def validate_fields(fields: Optional[Iterable[str]], allowed: Iterable[str]):
+    """Raise ValueError if any requested field isn't an allowed top-level key."""
+    unknown = sorted(set(fields or ()) - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+
+def select_fields(data: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Keep only the requested top-level keys, or everything when fields is None."""
+    if fields is None:
+        return data
+    return {f: data[f] for f in fields if f in data}
+
+
+def input_etag(*parts: str) -> str:
+    """Strong ETag derived from the request inputs that determine the response."""
+    digest = hashlib.sha256(RESPONSE_VERSION.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\0")
+        digest.update((part or "").encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0.
+
+    A coding refused with q=0 stays refused even when "*" is accepted (RFC 9110).
+    """
+    accepted, refused = set(), set()
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            refused.add(name)
+        else:
+            accepted.add(name)
+
+    def acceptable(coding: str) -> bool:
+        return coding not in refused and (coding in accepted or "*" in accepted)
+
+    if brotli is not None and acceptable("br"):
+        return "br"
+    if acceptable("gzip"):
+        return "gzip"
+    return None
+
+
+def representation_etag(etag: str, encoding: Optional[str]) -> str:
+    # Strong validators must differ between content codings of the same resource
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """Return the client's validator if it matches any coding of `etag`, else None.
+
+    Uses the weak comparison that If-None-Match requires.
+    """
+    if not if_none_match:
+        return None
+    variants = {representation_etag(etag, encoding) for encoding in (None, "gzip", "br")}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return etag
+        opaque = tag[2:] if tag.startswith("W/") else tag
+        if opaque in variants:
+            return opaque
+    return None
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+def encode_response(data: Any, etag: Optional[str], accept_encoding: Optional[str]) -> Tuple[bytes, Dict[str, str]]:
+    """Serialize and, above the size threshold, compress a JSON body.
+
+    Returns the body and the headers to send with it.
+    """
+    body = dumps(data)
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = choose_encoding(accept_encoding) if len(body) >= COMPRESS_MIN_BYTES else None
+    if encoding:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    if etag:
+        headers["ETag"] = representation_etag(etag, encoding)
+    return body, headers
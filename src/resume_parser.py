@@ -0,0 +1,182 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.agent import BULLET_PATTERNS, CRITICAL_SECTIONS
+
+# Section headers beyond the critical ones used for ATS scoring
+SECTION_KEYWORDS = {
+    **CRITICAL_SECTIONS,
+    'summary': ['summary', 'profile', 'objective', 'about me'],
+    'projects': ['projects', 'personal projects'],
+    'certifications': ['certifications', 'certification', 'licenses'],
+}
+
+# Sections whose non-bullet lines are role/entry headers (company, title, dates)
+ROLE_SECTIONS = {'experience', 'projects'}
+
+# Bullet glyphs that PDF extraction produces but the ATS patterns don't cover
+PDF_BULLET_PATTERN = r'^\s*[●▪■○►➢✓]\s*'
+
+DATE_RANGE_REGEX = re.compile(
+    r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?\d{4}'
+    r'\s*(?:-|–|—|to)\s*'
+    r'(((?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?\d{4}|present|current|now)',
+    re.IGNORECASE,
+)
+
+MAX_HEADER_WORDS = 5
+
+# Keywords as whole words, so prefixed headers ("PROFESSIONAL EXPERIENCE") still count
+SECTION_KEYWORD_REGEXES = [
+    (kind, keyword, re.compile(rf'\b{re.escape(keyword)}\b'))
+    for kind, keywords in SECTION_KEYWORDS.items() for keyword in keywords
+]
+
+# Unbulleted lines this long under a role are descriptions, not header lines
+MIN_DESCRIPTION_WORDS = 12
+
+
+@dataclass
+class Bullet:
+    text: str
+    line_no: int
+
+
+@dataclass
+class Role:
+    header: str
+    dates: Optional[str] = None
+    bullets: List[Bullet] = field(default_factory=list)
+
+
+@dataclass
+class Section:
+    kind: str
+    heading: str
+    lines: List[str] = field(default_factory=list)
+    roles: List[Role] = field(default_factory=list)
+    bullets: List[Bullet] = field(default_factory=list)
+
+    def all_bullets(self) -> List[Bullet]:
+        """Section-level bullets followed by role bullets, in document order."""
+        ordered = list(self.bullets)
+        for role in self.roles:
+            ordered.extend(role.bullets)
+        return sorted(ordered, key=lambda b: b.line_no)
+
+
+@dataclass
+class ParsedResume:
+    text: str
+    header_lines: List[str]
+    sections: List[Section]
+
+    def section(self, kind: str) -> Optional[Section]:
+        return next((s for s in self.sections if s.kind == kind), None)
+
+    @property
+    def bullets(self) -> List[str]:
+        return [b.text for s in self.sections for b in s.all_bullets()]
+
+    @property
+    def experience_bullets(self) -> List[str]:
+        """Bullets from experience-like sections, falling back to every bullet."""
+        found = [b.text for s in self.sections if s.kind in ROLE_SECTIONS for b in s.all_bullets()]
+        return found or self.bullets
+
+
+def detect_section(line: str) -> Optional[str]:
+    """Return the section kind if the line looks like a section header."""
+    heading = line.strip().lstrip('#').strip().rstrip(':').strip().lower()
+    if not heading or len(heading.split()) > MAX_HEADER_WORDS or match_bullet(line) is not None:
+        return None
+    # Other short lines only count when styled like a header ("PROFESSIONAL EXPERIENCE",
+    # "Relevant Experience", "Work history:"); the keyword nearest the start wins
+    styled = line.strip().isupper() or line.strip().istitle() or line.strip().endswith(':')
+    best = None
+    for kind, keyword, pattern in SECTION_KEYWORD_REGEXES:
+        if heading == keyword:
+            return kind
+        if styled:
+            m = pattern.search(heading)
+            if m and (best is None or (m.start(), -len(keyword)) < best[0]):
+                best = ((m.start(), -len(keyword)), kind)
+    return best[1] if best else None
+
+
+def match_bullet(line: str) -> Optional[str]:
+    """Return the bullet text without its marker, or None if the line isn't a bullet."""
+    # Trailing space lets a lone marker ("•") match as an empty bullet
+    text = line.strip() + ' '
+    for pattern in BULLET_PATTERNS + [PDF_BULLET_PATTERN]:
+        m = re.match(pattern, text)
+        if m:
+            return text[m.end():].strip()
+    return None
+
+
+def _is_continuation(previous: Bullet, line: str) -> bool:
+    # PDF extraction wraps long bullets onto the next line
+    return not previous.text.endswith(('.', '!', '?')) and line[:1].islower()
+
+
+def parse_resume(resume_text: str) -> ParsedResume:
+    """Segment resume text (plain or PDF-extracted) into sections, roles and bullets."""
+    header_lines: List[str] = []
+    sections: List[Section] = []
+    current: Optional[Section] = None
+    last_bullet: Optional[Bullet] = None
+
+    for line_no, raw in enumerate(resume_text.split('\n')):
+        line = raw.strip()
+        if not line:
+            continue
+
+        kind = detect_section(line)
+        # A header-like line of the section already open ("Master's Degree" under
+        # EDUCATION) is content, not a new section
+        if kind and (current is None or kind != current.kind):
+            current = Section(kind=kind, heading=line.lstrip('#').strip())
+            sections.append(current)
+            last_bullet = None
+            continue
+
+        if current is None:
+            header_lines.append(line)
+            continue
+        current.lines.append(line)
+
+        bullet_text = match_bullet(line)
+        if bullet_text is not None:
+            if not bullet_text:
+                continue
+            last_bullet = Bullet(text=bullet_text, line_no=line_no)
+            if current.kind in ROLE_SECTIONS and current.roles:
+                current.roles[-1].bullets.append(last_bullet)
+            else:
+                current.bullets.append(last_bullet)
+            continue
+
+        if last_bullet is not None and _is_continuation(last_bullet, line):
+            last_bullet.text = f"{last_bullet.text} {line}"
+            continue
+
+        if current.kind in ROLE_SECTIONS:
+            line = ' '.join(line.split())
+            if current.roles and len(line.split()) >= MIN_DESCRIPTION_WORDS:
+                last_bullet = Bullet(text=line, line_no=line_no)
+                current.roles[-1].bullets.append(last_bullet)
+                continue
+            role = current.roles[-1] if current.roles and not current.roles[-1].bullets else None
+            if role is None:
+                role = Role(header=line)
+                current.roles.append(role)
+            else:
+                role.header = f"{role.header} | {line}"
+            dates = DATE_RANGE_REGEX.search(line)
+            if dates and role.dates is None:
+                role.dates = dates.group(0)
+            last_bullet = None
+
+    return ParsedResume(text=resume_text, header_lines=header_lines, sections=sections)